@@ -33,7 +33,9 @@
 # DOCUMENTATION, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 # ===----------------------------------------------------------------------===
 
-from positional_order import PositionalOrderMixin
+from positional_order import (PositionalOrderMixin, PositionalPaginator,
+  SlowPositionalOperationLogger, assert_positional_operations,
+  positional_operation)
 from serialized_repr  import (SerializedReprMixin, XMLSerializedReprMixin,
   JSONSerializedReprMixin, YAMLSerializedReprMixin)
 from uuid_primary_key import UUIDPrimaryKeyMixin
@@ -42,11 +44,15 @@ from uuid_stamped     import UUIDStampedMixin
 __all__ = [
   "JSONSerializedRepr",
   "PositionalOrderMixin",
+  "PositionalPaginator",
   "SerializedRepr",
+  "SlowPositionalOperationLogger",
   "UUIDPrimaryKeyMixin",
   "UUIDStampedMixin",
   "XMLSerializedRepr",
   "YAMLSerializedRepr",
+  "assert_positional_operations",
+  "positional_operation",
 ]
 
 # ===----------------------------------------------------------------------===
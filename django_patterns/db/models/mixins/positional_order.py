@@ -41,13 +41,58 @@ snippet (heavily modified):
 
 <http://djangosnippets.org/snippets/259/>"""
 
+# Python standard library, JSON encoding
+import json
+
+# Python standard library, binary encodings
+import base64
+
+# Python standard library, logging
+import logging
+
+# Python standard library, miscellaneous
+import random
+import time
+import zlib
+from functools import wraps
+
+# Django.core, pagination
+from django.core.paginator import InvalidPage
+
+# Django.core, exceptions
+from django.core.exceptions import ValidationError
+
 # Django.core, object-relational mapper
-from django.db import models, transaction
+from django.db import connection, connections, models, router, transaction
+from django.db.utils import DatabaseError, IntegrityError
 from django.db.models.fields import FieldDoesNotExist
+from django.db.models.fields.related import add_lazy_relation, \
+  RECURSIVE_RELATIONSHIP_CONSTANT
+from django.db.backends.util import truncate_name
+
+# Django.core, signals
+from django.dispatch import Signal
+
+# Django.core, utilities
+from django.utils.functional import curry
 
 # Django.core, translation
 from django.utils.translation import ugettext_lazy as _
 
+# The Meta options which PositionalOrderMixin understands, and takes out of the
+# Meta attribute before Django gets to see it.
+_POSITION_META_OPTIONS = (
+  'order_with_respect_to',
+  'position_spacing',
+  'position_keys',
+  'position_growth',
+  'position_locking',
+  'position_unique',
+  'position_index',
+  'position_length',
+  'position_through',
+)
+
 class _InjectingModelBase(models.base.ModelBase):
   """This helper metaclass is used by PositionalOrderMixin. It inspects the
   Meta option `order_with_respect_to` and in most cases injects into the model
@@ -58,81 +103,316 @@ class _InjectingModelBase(models.base.ModelBase):
   If `order_with_respect_to` specifies a single ForeignKey field (or a
   OneToOneField), the methods `get_RELATED_order()` and `set_RELATED_order()`
   are added to the related model (with the same semantics as the default
-  Django behavior)."""
+  Django behavior).
+
+  The Meta option `position_spacing` selects how positions are numbered. The
+  default of 1 keeps positions dense (0, 1, 2, ...), so that `_position` is
+  also the index of the element within its list. Any larger value makes the
+  numbering sparse: elements are appended `position_spacing` apart and a
+  moved element takes a position in between its new neighbours, so that only
+  when such a gap is exhausted does a neighbourhood of the list need to be
+  renumbered. Sparse positions are stored in a BigIntegerField.
+
+  Alternatively, the Meta option `position_keys = 'lexicographic'` stores
+  positions as strings which are ordered lexicographically (see
+  `_lexicographic_key_between()`). As there is always another string in
+  between any two others, a moved element can nearly always be given a new
+  position without touching any other row of the list.
+
+  The Meta option `position_keys = 'linked'` does away with positions
+  altogether, and instead links each element to the elements before and after
+  it in its list with the foreign keys `_prev` and `_next`. Moving an element
+  rewrites the links of no more than the element itself and its old and new
+  neighbours, with a single UPDATE statement, and appending or deleting an
+  element those of its neighbours. The elements of a linked list cannot be
+  ordered by a column, so a whole list is read in order by following the
+  links with a recursive query (see `_positional_linked_sql()`), and an
+  element at a given index is found by reading the order of the list. The
+  lists of a linked model cannot be paged through by position, checked and
+  repaired, or appended to in bulk.
+
+  Non-dense positions cannot be used to find the element at a given index, so
+  by default this is done by counting off elements with an OFFSET scan. The
+  Meta option `position_index = True` instead maintains a count of the
+  elements of each list in buckets of the position space (see
+  `_create_position_index()`), so that only the buckets and the elements of a
+  single bucket need to be counted.
+
+  The Meta option `position_length = True` keeps a count of the elements of
+  each list in a table of its own (see `_create_position_length()`), so that
+  the length of a list, and with it the back of a list under dense numbering,
+  can be read from a single row instead of being counted.
+
+  The Meta option `position_growth = 'front'` has new elements saved without
+  a position take their place at the front of their list rather than at the
+  back, one before the position of the element currently there. Under dense
+  numbering the positions of such a list remain contiguous but run from
+  however far below zero the list has grown, so that prepending an element
+  writes only the element itself. The `normalize_positions` management
+  command moves each list back to start at zero from time to time.
+
+  For each concrete model syncdb creates an index over the columns of the
+  `order_with_respect_to` fields followed by `_position` (see
+  `_create_position_composite_indexes()`), which serves every lookup of an
+  element by its position within a list. With the Meta option
+  `position_unique = True` this is instead a unique constraint on PostgreSQL,
+  deferred until the end of each transaction so that positions can be
+  shifted past one another.
+
+  A single `_position` field cannot order the elements differently for each
+  of the objects they are related to through a ManyToManyField. So with the
+  Meta option `position_through = True`, `order_with_respect_to` specifies a
+  single ManyToManyField of the model itself, which does not name an
+  intermediary model of its own, and no `_position` field is injected.
+  Instead, an intermediary model is created which uses PositionalOrderMixin
+  itself, ordered with respect to the related object (see
+  `_create_position_through()`). Each of its instances is an entry of an
+  element in the list of a related object, and it is these entries which are
+  moved around. The intermediary model counts as created by Django, so that
+  the field's add(), remove() and clear() can be used: entries which are
+  added go to the back of their lists, and those which are removed leave no
+  gaps behind.
+
+  Finally, the Meta option `position_locking = True` serializes concurrent
+  modifications of the same list (see `_positional_lock()`), so that elements
+  appended at the same time by different connections cannot end up with the
+  same position."""
 
   def __new__(cls, name, bases, attrs):
     """Metaclass constructor calling Django and then modifying the resulting
     class."""
 
-    # Extract the `order_with_respect_to`, and do some preprocessing to get it
-    # in standard form.
-    try:
-      # Extract the `order_with_respect_to` configuration option from the Meta
-      # attribute. This will raise a `KeyError` if there is no Meta attribute,
-      # or an `AttributeError` if order_with_respect_to is not specified.
-      owrt = attrs['Meta'].order_with_respect_to
-      del attrs['Meta'].order_with_respect_to
-
-      # For compatibility with existing Django functionality, it is possible
-      # to specify `order_with_respect_to` as a string specifying a single
-      # attribute. Note that in Python 2.x `isinstance(obj,str)` is not the
-      # same as `isinstance(obj,unicode)`.
-      if isinstance(owrt, basestring):
-        owrt = (owrt,)
-      else:
-        owrt = tuple(owrt)
+    # The classes Django builds for instances loaded with some of their fields
+    # deferred are proxies which take after their model in every respect.
+    # Django 1.4 sends the signals for deleting such instances with the
+    # deferred class as sender, though, so the handlers keeping the position
+    # index and the list lengths are connected to it as well:
+    if attrs.get('_deferred', False):
+      model = super(_InjectingModelBase, cls).__new__(cls, name, bases, attrs)
+      if model._positional_index is not None or \
+         model._positional_length is not None:
+        models.signals.pre_delete.connect(_position_saved_pre_delete,
+          sender=model)
+      if model._positional_index is not None:
+        models.signals.post_delete.connect(_position_index_post_delete,
+          sender=model)
+      if model._positional_length is not None:
+        models.signals.post_delete.connect(_position_length_post_delete,
+          sender=model)
+      return model
 
-      # Specifying `'self'` or `('self',)` is the same as `()`. We'll
-      # explicitly unify these cases.
-      if 'self' in owrt:
-        if len(owrt) is not 1:
-          raise ValueError, _(u"‘self’ cannot be combined with other fields in order_with_respect_to expression.")
-        else:
-          owrt = ()
+    # Take the options of the mixin out of the Meta attribute, where Django
+    # would reject them. Only options set on the Meta attribute itself are
+    # taken (and those it inherits from another Meta class ignored), as it is
+    # only from there that they can be removed.
+    options = {}
+    meta = attrs.get('Meta')
+    if meta is not None:
+      for option in _POSITION_META_OPTIONS:
+        if option in vars(meta):
+          options[option] = vars(meta)[option]
+          delattr(meta, option)
 
-    # See the first two lines of the try block for the source of these
-    # exceptions:
-    except (KeyError, AttributeError):
-      owrt = ()
+    # Extract the `order_with_respect_to`, and do some preprocessing to get it
+    # in standard form. For compatibility with existing Django functionality,
+    # it is possible to specify `order_with_respect_to` as a string
+    # specifying a single attribute. Note that in Python 2.x
+    # `isinstance(obj,str)` is not the same as `isinstance(obj,unicode)`.
+    owrt = options.get('order_with_respect_to', ())
+    if isinstance(owrt, basestring):
+      owrt = (owrt,)
+    else:
+      owrt = tuple(owrt)
+
+    # Specifying `'self'` or `('self',)` is the same as `()`. We'll explicitly
+    # unify these cases.
+    if 'self' in owrt:
+      if len(owrt) is not 1:
+        raise ValueError, _(u"‘self’ cannot be combined with other fields in order_with_respect_to expression.")
+      else:
+        owrt = ()
 
     # Save the `order_with_respect_to` configuration parameter to our own
     # attribute. While doing so, we check to see if a subclass has provided a
     # different `order_with_respect_to`, in which case we use that.
-    try:
-      owrt = attrs['_positional_order_with_respect_to']
-    except KeyError:
-      attrs['_positional_order_with_respect_to'] = owrt
+    owrt = attrs.setdefault('_positional_order_with_respect_to', owrt)
+
+    # The `position_spacing` configuration option. If it is not specified the
+    # spacing is inherited from the superclass, which is ultimately
+    # PositionalOrderMixin's dense default.
+    if 'position_spacing' in options:
+      spacing = options['position_spacing']
+      if not isinstance(spacing, (int, long)) or spacing < 1:
+        raise ValueError, _(u"position_spacing must be a positive integer.")
+      attrs.setdefault('_positional_spacing', spacing)
+
+    # And likewise for the `position_keys` configuration option:
+    if 'position_keys' in options:
+      keys = options['position_keys']
+      if keys not in ('integer', 'lexicographic', 'linked'):
+        raise ValueError, _(u"position_keys must be one of ‘integer’, ‘lexicographic’ or ‘linked’.")
+      attrs.setdefault('_positional_keys', keys)
+
+    # And the `position_growth` configuration option:
+    if 'position_growth' in options:
+      growth = options['position_growth']
+      if growth not in ('back', 'front'):
+        raise ValueError, _(u"position_growth must be either ‘back’ or ‘front’.")
+      attrs.setdefault('_positional_growth', growth)
+
+    # And the `position_locking` and `position_unique` configuration options:
+    if 'position_locking' in options:
+      attrs.setdefault('_positional_locking',
+                       bool(options['position_locking']))
+    if 'position_unique' in options:
+      attrs.setdefault('_positional_unique', bool(options['position_unique']))
+
+    # And the `position_index` and `position_length` configuration options,
+    # which are not inherited:
+    index = options.get('position_index', False)
+    length = options.get('position_length', False)
+
+    # Point the ManyToManyField a model with the `position_through` option is
+    # ordered with respect to at the intermediary model which will hold the
+    # positions, by name, as it can only be created once the model itself
+    # exists:
+    through = None
+    if options.get('position_through', False) and \
+       not getattr(attrs.get('Meta'), 'abstract', False):
+      through = len(owrt) == 1 and attrs.get(owrt[0]) or None
+      if not isinstance(through, models.ManyToManyField) or \
+         through.rel.through is not None:
+        raise ValueError, _(u"position_through requires order_with_respect_to to name a single ManyToManyField of the model, without an intermediary model of its own.")
+      through.rel.through = '%sPosition' % name
+      # An element listed under another element of the same model is not
+      # listed under it in turn, as Django would have it for a symmetrical
+      # relation (which it does not allow an intermediary model for anyway):
+      if through.rel.to in (RECURSIVE_RELATIONSHIP_CONSTANT, name):
+        through.rel.symmetrical = False
 
     # Ask Django nicely for the model class it has built.
     model = super(_InjectingModelBase, cls).__new__(cls, name, bases, attrs)
 
+    # Create the intermediary model, if need be:
+    if through is not None:
+      if model._positional_keys == 'linked':
+        raise ValueError, _(u"linked positions cannot be ordered with respect to a ManyToManyField.")
+      model._positional_through = _create_position_through(model, through)
+      model._positional_through_source = \
+        _position_through_names(model, through)[0]
+
     # Try to add the _position field:
     try:
-      # Create the IntegerField:
-      position_field = models.IntegerField(editable=False, unique=False)
-      # Try injecting the _position field into the class:
-      try:
-        # Attempt to get the `_position` field:
-        model._meta.get_field('_position')
-      except FieldDoesNotExist:
-        # It was not found--create it now:
-        model.add_to_class('_position', position_field)
+      # The fields of the model by name, looked up once rather than with a
+      # get_field() (and the exception it raises when there is no such field)
+      # for each field looked for here. Many-to-many fields are only added
+      # for a list ordered with respect to a field not found among the
+      # others. Reverse relations, which a list may also be ordered with
+      # respect to, are not fields of the model at all.
+      fields = dict((field.name, field) for field in model._meta.fields)
+      if not set(owrt).issubset(fields):
+        fields.update((field.name, field)
+                      for field in model._meta.many_to_many)
+
+      # Try injecting the _position field into the class. This is only done
+      # for concrete models, as a field injected into an abstract model would
+      # be copied as-is into its subclasses, whose numbering may differ.
+      if not model._meta.abstract and model._positional_through is None and \
+         model._positional_keys == 'linked':
+        if '_prev' not in fields:
+          # Linked elements are not ordered by a position, but by the links
+          # to their neighbours, which are cleared rather than followed when
+          # a neighbour is deleted behind the mixin's back:
+          for name in ('_prev', '_next'):
+            model.add_to_class(name, models.ForeignKey(model, null=True,
+              editable=False, related_name='+', on_delete=models.SET_NULL))
+      elif not model._meta.abstract and model._positional_through is None:
+        if '_position' not in fields:
+          # It was not found--create it now. Sparse positions are spread
+          # across a much larger range, and so need 64 bits of storage. The
+          # explicit default of a lexicographic position gives new instances
+          # a `_position` of None rather than an empty string, as for the
+          # integer fields.
+          if model._positional_keys == 'lexicographic':
+            position_field = models.CharField(editable=False, unique=False,
+              max_length=_LEXICOGRAPHIC_MAX_LENGTH, default=None)
+          elif model._positional_spacing > 1:
+            position_field = models.BigIntegerField(editable=False,
+              unique=False)
+          else:
+            position_field = models.IntegerField(editable=False,
+              unique=False)
+          model.add_to_class('_position', position_field)
+
+      # Under dense numbering `_position` doubles as the index of the element
+      # within its list (offset by the position of the front of a list which
+      # grows at the front), which many of the list operations take advantage
+      # of.
+      model._positional_dense = model._positional_keys == 'integer' and \
+                                model._positional_spacing == 1
+
+      # Resolve the `order_with_respect_to` fields, by which the position
+      # index and the list lengths among others identify a list, once and
+      # for all:
+      if not model._meta.abstract:
+        model._positional_list_fields = tuple(fields.get(name)
+                                              for name in owrt)
+        model._positional_list_attnames = tuple(
+          field is not None and field.attname or name
+          for name, field in zip(owrt, model._positional_list_fields))
+        model._positional_list_attrs = tuple(
+          zip(owrt, model._positional_list_attnames))
+
+      if (index or length) and model._positional_keys == 'linked':
+        raise ValueError, _(u"position_index and position_length cannot be used with linked positions.")
+
+      if (index or length) and not model._meta.abstract:
+        models.signals.pre_delete.connect(_position_saved_pre_delete,
+          sender=model)
+
+      # Create the position index, if one was asked for:
+      if index and not model._meta.abstract:
+        if model._positional_dense:
+          raise ValueError, _(u"position_index requires sparse or lexicographic positions.")
+        model._positional_index = _create_position_index(model)
+        models.signals.post_delete.connect(_position_index_post_delete,
+          sender=model)
+
+      # And the list lengths:
+      if length and not model._meta.abstract:
+        model._positional_length = _create_position_length(model)
+        models.signals.post_delete.connect(_position_length_post_delete,
+          sender=model)
 
       # Set _position as the first field to order by. Of course this gets
       # overridden when using database queries which request another ordering
       # method vis the order_by method.
-      if '_position' not in model._meta.ordering:
+      if '_position' not in model._meta.ordering and \
+         model._positional_through is None and \
+         model._positional_keys != 'linked':
         model._meta.ordering = ['_position'] + list(model._meta.ordering)
 
-      # Inject the default manager if one was never provided.
-      try:
-        # Attempt to get the `objects` field:
-        model._meta.get_field('objects')
-      except FieldDoesNotExist:
-        # It was not found--create it now:
+      # Add `get_RELATED_order()` and `set_RELATED_order()` to the related
+      # model, right away if it is ready, or else once it has been loaded.
+      # (The list might also be ordered with respect to a reverse relation,
+      # which is not a field of the model.)
+      if len(owrt) == 1 and not model._meta.abstract and \
+         isinstance(model._positional_list_fields[0], models.ForeignKey):
+        field = model._positional_list_fields[0]
+        if isinstance(field.rel.to, basestring) or \
+           field.rel.to._meta.pk is None:
+          add_lazy_relation(model, field, field.rel.to,
+            _make_related_order_accessors)
+        else:
+          _make_related_order_accessors(field, field.rel.to, model)
+
+      # Inject the default manager if the class was not given one of its own
+      # (a manager inherited from a concrete superclass would manage the
+      # superclass instead):
+      if 'objects' not in vars(model):
         model.add_to_class(
           'objects',
-          models.Manager()
+          _PositionalManager()
         )
 
     except AttributeError:
@@ -143,9 +423,738 @@ class _InjectingModelBase(models.base.ModelBase):
     # We're done--output the class, it's ready for use:
     return model
 
-class _PositionalOrderManager(models.Manager):
+# Lexicographic positions are written using only the following digits, whose
+# byte-wise order is also their order under the usual linguistic collations.
+_LEXICOGRAPHIC_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+# Each lexicographic position starts with an integer part of fixed width, so
+# that elements appended or prepended to a list get short positions. Whatever
+# follows is a fractional part, with no trailing zero digits.
+_LEXICOGRAPHIC_INTEGER_WIDTH = 6
+
+# The maximum length of a lexicographic position. When a position would need
+# to be any longer, the positions around it are spread out again instead.
+_LEXICOGRAPHIC_MAX_LENGTH = 255
+
+def _lexicographic_encode(number):
+  "Writes `number` as the integer part of a lexicographic position."
+  digits = []
+  for idx in xrange(_LEXICOGRAPHIC_INTEGER_WIDTH):
+    number, digit = divmod(number, len(_LEXICOGRAPHIC_DIGITS))
+    digits.append(_LEXICOGRAPHIC_DIGITS[digit])
+  return ''.join(reversed(digits))
+
+def _lexicographic_midpoint(lower, upper):
+  """Returns a fractional part strictly between the fractional parts `lower`
+  and `upper`, where an `upper` of None stands for one. The result is no
+  longer than it needs to be."""
+  digits = _LEXICOGRAPHIC_DIGITS
+  if upper is not None:
+    # Skip over any common prefix, treating `lower` as zero-padded:
+    idx = 0
+    while (lower[idx:idx+1] or digits[0]) == upper[idx]:
+      idx += 1
+    if idx:
+      return upper[:idx] + _lexicographic_midpoint(lower[idx:], upper[idx:])
+  # The first digits now differ:
+  low = lower and digits.index(lower[0]) or 0
+  high = upper is None and len(digits) or digits.index(upper[0])
+  if high - low > 1:
+    return digits[(low + high) // 2]
+  if upper is not None and len(upper) > 1:
+    return upper[0]
+  return digits[low] + _lexicographic_midpoint(lower[1:], None)
+
+def _lexicographic_key_between(lower, upper):
+  """Returns a lexicographic position strictly between `lower` and `upper`,
+  either of which may be None to stand for the corresponding end of the list,
+  or None if there is no such position short enough to be stored."""
+  width = _LEXICOGRAPHIC_INTEGER_WIDTH
+  limit = len(_LEXICOGRAPHIC_DIGITS) ** width
+  if lower is None and upper is None:
+    return _lexicographic_encode(limit // 2)
+  if lower is None:
+    # Take the integer part of `upper` by itself, or the integer before it:
+    if upper[width:]:
+      return upper[:width]
+    number = int(upper, len(_LEXICOGRAPHIC_DIGITS)) - 1
+    return number >= 0 and _lexicographic_encode(number) or None
+  if upper is None:
+    number = int(lower[:width], len(_LEXICOGRAPHIC_DIGITS)) + 1
+    return number < limit and _lexicographic_encode(number) or None
+  low = int(lower[:width], len(_LEXICOGRAPHIC_DIGITS))
+  high = int(upper[:width], len(_LEXICOGRAPHIC_DIGITS))
+  if high - low > 1:
+    return _lexicographic_encode((low + high) // 2)
+  if high - low == 1:
+    if upper[width:]:
+      return upper[:width]
+    key = lower[:width] + _lexicographic_midpoint(lower[width:], None)
+  else:
+    key = lower[:width] + _lexicographic_midpoint(lower[width:], upper[width:])
+  return len(key) <= _LEXICOGRAPHIC_MAX_LENGTH and key or None
+
+def _lexicographic_keys_between(lower, upper, count):
+  """Returns a list of `count` ascending lexicographic positions strictly
+  between `lower` and `upper` (either of which may be None), or None if they
+  would not all be comfortably short of the maximum length."""
+  width = _LEXICOGRAPHIC_INTEGER_WIDTH
+  limit = len(_LEXICOGRAPHIC_DIGITS) ** width
+  # Towards an open end of the list successive integers are used, just as if
+  # the elements had been appended or prepended one by one:
+  if lower is None or upper is None:
+    if upper is not None:
+      start = int(upper[:width], len(_LEXICOGRAPHIC_DIGITS)) - count
+      if upper[width:]:
+        start += 1
+    elif lower is not None:
+      start = int(lower[:width], len(_LEXICOGRAPHIC_DIGITS)) + 1
+    else:
+      start = (limit - count) // 2
+    if start < 0 or start + count > limit:
+      return None
+    return map(_lexicographic_encode, xrange(start, start + count))
+  # Otherwise the range is bisected recursively:
+  if not count:
+    return []
+  middle = _lexicographic_key_between(lower, upper)
+  if middle is None or len(middle) > _LEXICOGRAPHIC_MAX_LENGTH // 2:
+    return None
+  before = _lexicographic_keys_between(lower, middle, count // 2)
+  after = _lexicographic_keys_between(middle, upper, count - count // 2 - 1)
+  if before is None or after is None:
+    return None
+  return before + [middle] + after
+
+# The number of elements appended one after the other which fall into the same
+# bucket of a position index.
+_POSITION_INDEX_BUCKET = 256
+
+def _create_position_index(model):
+  """Creates the model which backs the position index of `model`, named after
+  it and stored in the same application. Each row counts the elements of one
+  list whose positions fall into one bucket of the position space; each list
+  is identified by the JSON-encoded values of its `order_with_respect_to`
+  fields, as returned by `_position_index_key()`."""
+  class Meta:
+    app_label = model._meta.app_label
+    db_table = '%s_position_index' % model._meta.db_table
+    unique_together = (('list_key', 'bucket'),)
+  return type('%sPositionIndex' % model._meta.object_name, (models.Model,), {
+    '__module__': model.__module__,
+    'Meta': Meta,
+    'list_key': models.CharField(max_length=255),
+    'bucket': models.BigIntegerField(),
+    'count': models.IntegerField(default=0),
+  })
+
+def _position_index_key(values):
+  """Returns the key identifying a list in a position index, given the values
+  of its `order_with_respect_to` fields (with related objects represented by
+  their primary keys)."""
+  return json.dumps([None if value is None else unicode(value)
+                     for value in values])
+
+def _position_counter_add(model, lookup, field, delta):
+  """Adds `delta` to the counter `field` of the row of `model` (a position
+  index or list length model) matching `lookup`, creating the row if there is
+  none yet. Should another transaction create the row in the meantime, the
+  unique constraint on `lookup` keeps it from being created twice; the
+  creation is then rolled back to a savepoint, and the row updated after
+  all."""
+  rows = model.objects.filter(**lookup)
+  if rows.update(**{field: models.F(field) + delta}):
+    return
+  db = router.db_for_write(model)
+  sid = transaction.savepoint(using=db)
+  try:
+    model.objects.create(**dict(lookup, **{field: delta}))
+  except IntegrityError:
+    transaction.savepoint_rollback(sid, using=db)
+    rows.update(**{field: models.F(field) + delta})
+  else:
+    transaction.savepoint_commit(sid, using=db)
+
+def _position_saved_pre_delete(sender, instance, **kwargs):
+  """Makes sure that the list and position an element to be deleted was saved
+  with are known, as they can no longer be read once it has been deleted."""
+  instance._positional_saved
+
+def _position_index_post_delete(sender, instance, **kwargs):
+  """Removes a deleted element from the position index. This is a signal
+  handler so that elements deleted in bulk or by a cascade are accounted for
+  as well."""
+  key, position = instance._positional_saved
+  if position is not None:
+    sender._positional_index_adjust(key,
+      sender._positional_bucket(position), -1)
+
+def _create_position_length(model):
+  """Creates the model which keeps the length of each list of `model`, named
+  after it and stored in the same application. Lists are identified in the
+  same way as by the position index."""
+  class Meta:
+    app_label = model._meta.app_label
+    db_table = '%s_position_length' % model._meta.db_table
+  return type('%sPositionLength' % model._meta.object_name, (models.Model,), {
+    '__module__': model.__module__,
+    'Meta': Meta,
+    'list_key': models.CharField(max_length=255, unique=True),
+    'length': models.IntegerField(default=0),
+  })
+
+def _position_length_post_delete(sender, instance, **kwargs):
+  """Removes a deleted element from the length of its list. This is a signal
+  handler so that elements deleted in bulk or by a cascade are accounted for
+  as well."""
+  sender._positional_length_adjust(instance._positional_saved[0], -1)
+
+def _position_through_names(model, field):
+  """Returns the names of the foreign keys of the intermediary model of the
+  ManyToManyField `field` of `model` to `model` and to the related model, as
+  Django would name them: after the models, or for a relation of the model to
+  itself, after the model with `from_` and `to_` in front."""
+  to = field.rel.to
+  if isinstance(to, basestring):
+    to_name = to.split('.')[-1].lower()
+  else:
+    to_name = to._meta.object_name.lower()
+  from_name = model._meta.object_name.lower()
+  if to_name == from_name:
+    return 'from_%s' % from_name, 'to_%s' % to_name
+  return from_name, to_name
+
+def _create_position_through(model, field):
+  """Creates the intermediary model of the ManyToManyField `field` of `model`,
+  which holds the position of each element in the list of each object it is
+  related to. It has the same name, table and foreign keys as the
+  intermediary model Django would have created, and like it counts as
+  automatically created, but uses PositionalOrderMixin itself, with the
+  numbering options of `model`, and is ordered with respect to the related
+  object. The foreign key to `model` keeps its reverse relation, through
+  which the elements of a list are read in order; that of a relation of the
+  model to itself is hidden on the other foreign key."""
+  from_name, to_name = _position_through_names(model, field)
+  to = field.rel.to
+  to_options = {}
+  if from_name != model._meta.object_name.lower():
+    to_options['related_name'] = '%s_%s+' % (model.__name__, field.name)
+  class Meta:
+    app_label = model._meta.app_label
+    db_table = truncate_name('%s_%s' % (model._meta.db_table, field.name),
+                             connection.ops.max_name_length())
+    auto_created = model
+    order_with_respect_to = (to_name,)
+    unique_together = ((from_name, to_name),)
+  return type('%sPosition' % model._meta.object_name, (PositionalOrderMixin,), {
+    '__module__': model.__module__,
+    'Meta': Meta,
+    from_name: models.ForeignKey(model),
+    to_name: models.ForeignKey(to, **to_options),
+    '_positional_spacing': model._positional_spacing,
+    '_positional_keys': model._positional_keys,
+    '_positional_locking': model._positional_locking,
+    '_positional_growth': model._positional_growth,
+  })
+
+def _method_get_related_order(model, self):
+  return model.get_order(self)
+
+def _method_set_related_order(model, self, id_list):
+  model.set_order(id_list, self)
+
+def _make_related_order_accessors(field, related, model):
+  """Adds `get_RELATED_order()` and `set_RELATED_order()` to the model
+  `related`, which `model` is ordered with respect to through `field`."""
+  name = model.__name__.lower()
+  setattr(related, 'get_%s_order' % name,
+    curry(_method_get_related_order, model))
+  setattr(related, 'set_%s_order' % name,
+    curry(_method_set_related_order, model))
+
+class _PositionCase(object):
+  """A CASE expression mapping the primary keys of elements to the positions
+  they are to be given, which can be passed as the value of `_position` to
+  `QuerySet.update()` so that any number of elements are renumbered by a
+  single UPDATE statement. The links of linked elements are rewritten in the
+  same way, by passing the name of the field instead; elements which are not
+  mentioned keep the value they have."""
+  def __init__(self, model, positions, name='_position'):
+    self.model = model
+    self.positions = positions
+    self.name = name
+
+  def prepare_database_save(self, field):
+    return self
+
+  def as_sql(self, qn, connection):
+    pk = self.model._meta.pk
+    field = self.model._meta.get_field(self.name)
+    sql, params = ['CASE %s' % qn(pk.column)], []
+    for pk_value, position in self.positions:
+      sql.append('WHEN %s THEN %s')
+      params.extend([pk.get_db_prep_value(pk_value, connection),
+                     field.get_db_prep_value(position, connection)])
+    sql.append('ELSE %s END' % qn(field.column))
+    return ' '.join(sql), params
+
+class _PositionShiftCase(object):
+  """A CASE expression adding a different offset to the dense positions of
+  each of a number of disjoint ranges [start, stop), which can be passed as
+  the value of `_position` to `QuerySet.update()`. All ranges are shifted by
+  a single UPDATE statement, so that every row is matched against its
+  original position rather than against one it has already been shifted to.
+  The positions and offsets are integers, and are written into the statement
+  directly so that it is not subject to any limit on its parameters."""
+  def __init__(self, shifts):
+    self.shifts = shifts
+
+  def prepare_database_save(self, field):
+    return self
+
+  def as_sql(self, qn, connection):
+    column = qn('_position')
+    sql = ['CASE']
+    for start, stop, delta in self.shifts:
+      sql.append('WHEN %s >= %d AND %s < %d THEN %s + %d' %
+        (column, int(start), column, int(stop), column, int(delta)))
+    sql.append('ELSE %s END' % column)
+    return ' '.join(sql), []
+
+def _position_case_batch_size(connection):
+  """Returns the number of elements which can be renumbered by a single
+  `_PositionCase` UPDATE statement on `connection`, or None if there is no
+  practical limit. Each element takes up three parameters: two in the CASE
+  expression and one in the primary key IN clause."""
+  if connection.vendor == 'sqlite':
+    # SQLite limits a statement to 999 parameters, a few of which are needed
+    # to select the list:
+    return 999 // 3 - 4
+  if connection.vendor == 'oracle':
+    # Oracle limits an IN clause to 1,000 values:
+    return 1000
+  return None
+
+def _supports_recursive_queries(connection):
+  """Returns whether `connection` supports recursive common table expressions
+  (WITH RECURSIVE), with which a linked list is read in order."""
+  if connection.vendor == 'postgresql':
+    return True
+  if connection.vendor == 'sqlite':
+    from django.db.backends.sqlite3.base import Database
+    return Database.sqlite_version_info >= (3, 8, 3)
+  return False
+
+def _chain_links(order):
+  """Returns the primary keys of the elements before and after each element
+  of the linked list whose primary keys in order are `order`, in a
+  dictionary keyed on primary key."""
+  padded = [None] + list(order) + [None]
+  return dict((pk, (padded[idx], padded[idx+2]))
+              for idx, pk in enumerate(order))
+
+# The number of times a modification of a list is attempted, for models with
+# position locking, before giving up on a lock timeout or deadlock.
+_POSITION_LOCK_ATTEMPTS = 5
+
+# The PostgreSQL SQLSTATEs (serialization failure, deadlock detected and lock
+# not available) and MySQL error numbers (lock wait timeout and deadlock) of
+# the errors a modification is retried on, and the messages which give them
+# away once Django has wrapped the error in a DatabaseError of its own--which
+# is also the only way SQLite reports them.
+_POSITION_LOCK_ERROR_CODES = frozenset(['40001', '40P01', '55P03', 1205, 1213])
+_POSITION_LOCK_ERROR_MESSAGES = (
+  'database is locked',
+  'database table is locked',
+  'deadlock',
+  'could not serialize access',
+  'could not obtain lock',
+  'lock timeout',
+  'lock wait timeout',
+)
+
+def _is_lock_error(error):
+  """Returns whether the DatabaseError `error` reports a lock timeout,
+  deadlock or serialization failure, which retrying the transaction it
+  occurred in may get past, as opposed to any other error."""
+  code = getattr(error, 'pgcode', None)
+  if code is None and error.args:
+    code = error.args[0]
+  if isinstance(code, (basestring, int, long)) and \
+     code in _POSITION_LOCK_ERROR_CODES:
+    return True
+  message = repr(error.args).lower()
+  return any(text in message for text in _POSITION_LOCK_ERROR_MESSAGES)
+
+def _forget_neighbours(obj):
+  """Makes the element `obj` forget the neighbours it was read along with by
+  `iter_from()`, or annotated with by `with_neighbours()`, which it may no
+  longer have once it is modified."""
+  obj._positional_window = None
+  obj.__dict__.pop('positional_prev_pk', None)
+  obj.__dict__.pop('positional_next_pk', None)
+
+def _positional_snapshot(*args):
+  """Returns a function which puts the model instances among `args`, or in
+  lists or tuples among them, back into the state they are in now."""
+  instances = []
+  for arg in args:
+    if isinstance(arg, (list, tuple)):
+      instances.extend(arg)
+    else:
+      instances.append(arg)
+  states = [(obj, dict(obj.__dict__), obj._state.adding, obj._state.db)
+            for obj in instances if isinstance(obj, models.Model)]
+  def restore():
+    for obj, state, adding, db in states:
+      obj.__dict__.clear()
+      obj.__dict__.update(state)
+      obj._state.adding, obj._state.db = adding, db
+  return restore
+
+def _positional_mutation(func):
+  """Decorates a method of PositionalOrderMixin which modifies a list, so
+  that it runs within a transaction. For models with position locking, should
+  the database report a lock timeout or deadlock the method is retried after
+  a randomized back-off--but only if it started the transaction itself, as an
+  enclosing transaction cannot be restarted from here. Each attempt starts
+  from the instances as they were passed in, rather than from the positions
+  and primary keys the failed attempt gave them. Any other error is raised
+  straight away. An element which is modified forgets its neighbours."""
+  atomic = transaction.commit_on_success(func)
+  @wraps(func)
+  def inner(obj, *args, **kwargs):
+    if not isinstance(obj, type):
+      _forget_neighbours(obj)
+    if not obj._positional_locking or transaction.is_managed():
+      return atomic(obj, *args, **kwargs)
+    restore = _positional_snapshot(obj, *args + tuple(kwargs.values()))
+    for attempt in xrange(1, _POSITION_LOCK_ATTEMPTS + 1):
+      if attempt > 1:
+        restore()
+      try:
+        return atomic(obj, *args, **kwargs)
+      except IntegrityError:
+        raise
+      except DatabaseError, e:
+        if attempt == _POSITION_LOCK_ATTEMPTS or not _is_lock_error(e):
+          raise
+        time.sleep(random.uniform(0, 0.01 * 2**attempt))
+  return inner
+
+# Sent once an operation which modifies a list returns, with the model as the
+# sender. `operation` is the name of the method, `queries` the number of
+# statements it issued, `rows` the number of rows those statements inserted,
+# updated or deleted, and `lock_wait` and `duration` the seconds it spent
+# waiting for list locks and in total.
+positional_operation = Signal(
+  providing_args=['operation', 'queries', 'rows', 'lock_wait', 'duration'])
+
+class _PositionalStatistics(object):
+  "Accumulates the measurements of one positional operation."
+  def __init__(self):
+    self.queries = 0
+    self.rows = 0
+    self.lock_wait = 0.0
+
+class _PositionalCursor(object):
+  """Wraps a database cursor, so that the statements executed through it and
+  the rows they touch are accounted for in a `_PositionalStatistics`."""
+  def __init__(self, cursor, statistics):
+    self.cursor = cursor
+    self.statistics = statistics
+
+  def __getattr__(self, attr):
+    return getattr(self.cursor, attr)
+
+  def __iter__(self):
+    return iter(self.cursor)
+
+  def _record(self, sql):
+    self.statistics.queries += 1
+    if sql.lstrip()[:6].upper() in ('INSERT', 'UPDATE', 'DELETE'):
+      self.statistics.rows += max(self.cursor.rowcount, 0)
+
+  def execute(self, sql, params=()):
+    try:
+      return self.cursor.execute(sql, params)
+    finally:
+      self._record(sql)
+
+  def executemany(self, sql, param_list):
+    try:
+      return self.cursor.executemany(sql, param_list)
+    finally:
+      self._record(sql)
+
+def _positional_operation(func):
+  """Decorates a public method of PositionalOrderMixin (or of its QuerySet)
+  which modifies a list, so that it is reported through the
+  `positional_operation` signal once it returns. Nothing is measured while the
+  signal has no receivers, nor for an operation performed from within another
+  one, whose report it is part of."""
+  @wraps(func)
+  def inner(obj, *args, **kwargs):
+    if not positional_operation.receivers:
+      return func(obj, *args, **kwargs)
+    if isinstance(obj, type):
+      model, db = obj, router.db_for_write(obj)
+    elif isinstance(obj, models.query.QuerySet):
+      model, db = obj.model, obj.db
+    else:
+      model = obj.__class__
+      db = router.db_for_write(model, instance=obj)
+    connection = connections[db]
+    if getattr(connection, '_positional_statistics', None) is not None:
+      return func(obj, *args, **kwargs)
+    # Every statement goes through the cursor() of the connection, which is
+    # shadowed for the duration of the operation:
+    statistics = connection._positional_statistics = _PositionalStatistics()
+    cursor = connection.cursor
+    connection.cursor = lambda: _PositionalCursor(cursor(), statistics)
+    try:
+      start = time.time()
+      result = func(obj, *args, **kwargs)
+      duration = time.time() - start
+    finally:
+      del connection.cursor
+      connection._positional_statistics = None
+    positional_operation.send(sender=model, operation=func.__name__,
+      queries=statistics.queries, rows=statistics.rows,
+      lock_wait=statistics.lock_wait, duration=duration)
+    return result
+  return inner
+
+class SlowPositionalOperationLogger(object):
+  """A receiver for the `positional_operation` signal which logs a warning
+  for each operation taking at least `threshold` seconds. It is connected
+  with a strong reference, as in:
+
+    positional_operation.connect(SlowPositionalOperationLogger(0.5),
+                                 weak=False)"""
+  def __init__(self, threshold=1.0, logger=None):
+    self.threshold = threshold
+    self.logger = logger or logging.getLogger(__name__)
+
+  def __call__(self, sender, operation, queries, rows, lock_wait, duration,
+               **kwargs):
+    if duration < self.threshold:
+      return
+    self.logger.warning(
+      u"%s.%s.%s() took %.3fs: %d queries touching %d rows, "
+      u"%.3fs waiting for locks", sender._meta.app_label,
+      sender._meta.object_name, operation, duration, queries, rows,
+      lock_wait)
+
+class assert_positional_operations(object):
+  """A context manager which collects the reports of the positional
+  operations performed within it, and raises AssertionError on leaving it if
+  any of them exceeded one of the given upper bounds. Only the operations of
+  `model` are considered if it is given. The reports are made available as
+  a list of dictionaries, as in:
+
+    with assert_positional_operations(queries=4, rows=1) as reports:
+      obj.move_to_front()
+    self.assertEqual(['move_to_front'], [x['operation'] for x in reports])"""
+  _bounds = ('queries', 'rows', 'lock_wait', 'duration')
+
+  def __init__(self, model=None, **bounds):
+    for name in bounds:
+      if name not in self._bounds:
+        raise TypeError, u"unexpected bound %r" % name
+    self.model = model
+    self.bounds = bounds
+    self.reports = []
+
+  def _receive(self, sender, **kwargs):
+    if self.model is None or issubclass(sender, self.model):
+      kwargs.pop('signal', None)
+      kwargs['sender'] = sender
+      self.reports.append(kwargs)
+
+  def __enter__(self):
+    self.reports = []
+    positional_operation.connect(self._receive, weak=False,
+                                 dispatch_uid=id(self))
+    return self.reports
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    positional_operation.disconnect(dispatch_uid=id(self))
+    if exc_type is not None:
+      return
+    for report in self.reports:
+      for name, bound in self.bounds.iteritems():
+        if report[name] > bound:
+          raise AssertionError, u"%s.%s() exceeded %s: %r > %r" % (
+            report['sender']._meta.object_name, report['operation'], name,
+            report[name], bound)
+
+# The QuerySet of the `objects` manager of positional models, which deletes
+# elements as Django does. That of the internal manager closes the gaps the
+# deleted elements leave behind as well:
+class _PositionalQuerySet(models.query.QuerySet):
+  def with_neighbours(self):
+    """Annotates each element with the primary keys of the elements before
+    and after it in its list, as `positional_prev_pk` and
+    `positional_next_pk` (None at either end of the list), within the same
+    query. The neighbours are looked up in the whole list, whatever else
+    the QuerySet filters on or however it is sliced, so that the elements at
+    the edges of a page have theirs as well.
+
+    Linked elements have the primary keys of their neighbours at hand. Other
+    elements have them looked up with a correlated subquery for each
+    direction, served by the composite index over the list and position.
+    (Window functions would be cheaper still, but only see the rows the
+    QuerySet itself selects.) `get_next()` and `get_prev()` of an annotated
+    element read its neighbour by primary key, or answer at the ends of the
+    list without a query at all."""
+    model = self.model
+    if model._positional_through is not None:
+      raise ValueError, _(u"with_neighbours() does not support elements ordered with respect to a ManyToManyField.")
+    connection = connections[self.db]
+    qn = connection.ops.quote_name
+    if model._positional_keys == 'linked':
+      column = lambda name: '%s.%s' % (
+        qn(model._meta.get_field(name).model._meta.db_table),
+        qn(model._meta.get_field(name).column))
+      return self.extra(select={
+        'positional_prev_pk': column('_prev'),
+        'positional_next_pk': column('_next'),
+      })
+    # The subqueries only read the table of the model itself, so the list
+    # key and the position must be stored there, and not in the table of a
+    # concrete superclass:
+    position = model._meta.get_field('_position')
+    fields = model._positional_list_fields + (position,)
+    if filter(lambda x: x is None or x.model is not model, fields):
+      raise NotImplementedError, _(u"with_neighbours() requires the list key and position to be fields of the model itself.")
+    table = qn(model._meta.db_table)
+    alias = qn('_positional_neighbour')
+    where = []
+    for field in model._positional_list_fields:
+      column = qn(field.column)
+      if field.null:
+        where.append('(%s.%s = %s.%s OR (%s.%s IS NULL AND %s.%s IS NULL))' %
+                     (alias, column, table, column,
+                      alias, column, table, column))
+      else:
+        where.append('%s.%s = %s.%s' % (alias, column, table, column))
+    position = qn(position.column)
+    def neighbour(operator, order):
+      return ('SELECT %s.%s FROM %s %s WHERE %s%s.%s %s %s.%s '
+              'ORDER BY %s.%s %s LIMIT 1' % (
+        alias, qn(model._meta.pk.column), table, alias,
+        ''.join('%s AND ' % x for x in where),
+        alias, position, operator, table, position,
+        alias, position, order))
+    return self.extra(select={
+      'positional_prev_pk': neighbour('<', 'DESC'),
+      'positional_next_pk': neighbour('>', 'ASC'),
+    })
+
+class _PositionalManager(models.Manager):
+  def get_query_set(self):
+    return _PositionalQuerySet(self.model, using=self._db)
+
+  def with_neighbours(self):
+    return self.get_query_set().with_neighbours()
+
+class _PositionalOrderQuerySet(_PositionalQuerySet):
+  def bulk_create(self, objs, *args, **kwargs):
+    """Inserts the instances `objs` as `QuerySet.bulk_create()` does, except
+    that if any of them has no position yet they are appended to their lists
+    with `bulk_append()` instead. This is how the entries added to an
+    intermediary model by the `add()` of a ManyToManyField find their
+    places."""
+    model = self.model
+    # `objs` may be an iterator, which looking for an element without a
+    # position would use up:
+    objs = list(objs)
+    if model._positional_keys != 'linked' and \
+       model._positional_through is None and \
+       any(obj._position is None for obj in objs):
+      model.bulk_append(objs)
+      return objs
+    return super(_PositionalOrderQuerySet, self).bulk_create(
+      objs, *args, **kwargs)
+
+  @_positional_operation
+  def delete(self):
+    """Deletes the records in the current QuerySet, and then closes the gaps
+    left behind in each of the positional lists they were removed from. Each
+    list is renumbered with one ranged UPDATE per run of surviving elements,
+    rather than one save() per element."""
+    model = self.model
+    owrt = model._positional_order_with_respect_to
+    # Elements ordered with respect to a ManyToManyField are removed from
+    # their lists by deleting their entries in the intermediary model:
+    if model._positional_through is not None:
+      with transaction.commit_on_success(using=self.db):
+        model._positional_through._positional_order_manager.filter(**{
+          '%s__in' % model._positional_through_source: self.values('pk'),
+        }).delete()
+        return super(_PositionalOrderQuerySet, self).delete()
+    # Linked elements are removed from their lists by linking the elements
+    # either side of each run of deleted elements to one another:
+    if model._positional_keys == 'linked':
+      with transaction.commit_on_success(using=self.db):
+        if model._positional_locking:
+          keys = [()]
+          if owrt:
+            keys = set(self.values_list(*owrt))
+          for key in keys:
+            model._positional_lock(dict(zip(owrt, key)))
+        deleted = dict((row[0], row[1:])
+                       for row in self.values_list('pk', '_prev', '_next'))
+        prevs, nexts = {}, {}
+        for pk, (prev, next) in deleted.iteritems():
+          if prev in deleted:
+            continue
+          while next in deleted:
+            next = deleted[next][1]
+          if prev is not None:
+            nexts[prev] = next
+          if next is not None:
+            prevs[next] = prev
+        model._positional_relink(prevs, nexts)
+        return super(_PositionalOrderQuerySet, self).delete()
+    # Sparse positions need no renumbering--the gaps are there by design.
+    if not model._positional_dense:
+      return super(_PositionalOrderQuerySet, self).delete()
+    with transaction.commit_on_success(using=self.db):
+      # Lock each list affected before looking at its positions:
+      if model._positional_locking:
+        keys = [()]
+        if owrt:
+          keys = set(self.values_list(*owrt))
+        for key in keys:
+          model._positional_lock(dict(zip(owrt, key)))
+
+      # Record the positions about to be vacated, grouped by list:
+      vacated = {}
+      for row in self.values_list('_position', *owrt):
+        vacated.setdefault(row[1:], []).append(row[0])
+
+      super(_PositionalOrderQuerySet, self).delete()
+
+      # The elements lying between the i-th and (i+1)-th vacated positions of
+      # a list move forward by i. Processing the runs front to back ensures
+      # that no element is matched by more than one UPDATE.
+      for key, positions in vacated.iteritems():
+        kwargs = dict(zip(owrt, key))
+        positions.sort()
+        for idx, start in enumerate(positions):
+          try:
+            stop = positions[idx+1]
+          except IndexError:
+            stop = None
+          if stop != start + 1:
+            model._positional_shift(kwargs, start + 1, stop, -(idx + 1))
+  delete.alters_data = True
+
+class _PositionalOrderManager(_PositionalManager):
   def get_query_set(self):
-    return super(_PositionalOrderManager, self).get_query_set()
+    return _PositionalOrderQuerySet(self.model, using=self._db)
 
 def _match_args(params, *args, **kwargs):
   args = dict(zip(params, args))
@@ -180,6 +1189,51 @@ class PositionalOrderMixin(models.Model):
   # Assign a metaclass which injects the `_position` field.
   __metaclass__ = _InjectingModelBase
 
+  # Positions are dense integers unless the model says otherwise with the
+  # Meta options `position_spacing` and `position_keys`.
+  _positional_spacing = 1
+  _positional_keys = 'integer'
+
+  # The end of the list at which elements saved without a position are
+  # placed, as set with the Meta option `position_growth`.
+  _positional_growth = 'back'
+
+  # The model backing the position index, if the model has asked for one with
+  # the Meta option `position_index`.
+  _positional_index = None
+
+  # The model keeping the length of each list, if the model has asked for one
+  # with the Meta option `position_length`.
+  _positional_length = None
+
+  # Whether modifications of a list are serialized, as asked for with the Meta
+  # option `position_locking`.
+  _positional_locking = False
+
+  # Whether positions are constrained to be unique within each list where the
+  # database supports deferring the check, as asked for with the Meta option
+  # `position_unique`.
+  _positional_unique = False
+
+  # The intermediary model holding the positions, if the model is ordered
+  # with respect to a ManyToManyField (see `_create_position_through()`), and
+  # the name of its foreign key to this model.
+  _positional_through = None
+  _positional_through_source = None
+
+  # The `order_with_respect_to` fields of a concrete model (None for a reverse
+  # relation), the attributes holding their values, and the pairs of the two
+  # names by which `_positional_list_kwargs()` reads them, as resolved by the
+  # metaclass.
+  _positional_list_fields = ()
+  _positional_list_attnames = ()
+  _positional_list_attrs = ()
+
+  # The elements read along with this one by `iter_from()`, if any, as a
+  # tuple of the elements in list order, the index of this element among
+  # them, and whether they reach the front and the back of the list.
+  _positional_window = None
+
   _positional_order_manager = _PositionalOrderManager()
 
   def get_positional_list_kwargs(self):
@@ -200,12 +1254,30 @@ class PositionalOrderMixin(models.Model):
       ),
     ))
 
+  def _positional_list_kwargs(self):
+    """Returns the filter keyword arguments identifying this element's list,
+    as `get_positional_list_kwargs()` does but with the primary key of each
+    related object in place of the object itself, read from the attribute
+    Django keeps it in. No related object is fetched from the database."""
+    try:
+      return dict((name, getattr(self, attname))
+                  for name, attname in self._positional_list_attrs)
+    except ValueError:
+      return self.get_positional_list_kwargs()
+
   @classmethod
   def get_front(cls, *args, **kwargs):
     "Return the first element in the list."
     # Combine args and kwargs based on `order_with_respect_to`:
     kwargs = _match_args(cls._positional_order_with_respect_to, *args, **kwargs)
+    if cls._positional_through is not None:
+      return cls._positional_through_elements(kwargs)[:1].get()
     manager = cls._positional_order_manager
+    if cls._positional_keys == 'linked':
+      return cls._positional_linked_end(manager.filter(**kwargs),
+                                        '_prev')[:1].get()
+    if not cls._positional_dense or cls._positional_growth == 'front':
+      return manager.filter(**kwargs)[:1].get()
     return manager.get(_position=0, **kwargs)
 
   @classmethod
@@ -213,18 +1285,611 @@ class PositionalOrderMixin(models.Model):
     "Return the last element in the list."
     # Combine args and kwargs based on `order_with_respect_to`:
     kwargs = _match_args(cls._positional_order_with_respect_to, *args, **kwargs)
+    if cls._positional_through is not None:
+      return cls._positional_through_elements(kwargs).reverse()[:1].get()
     manager = cls._positional_order_manager
+    if cls._positional_keys == 'linked':
+      return cls._positional_linked_end(manager.filter(**kwargs),
+                                        '_next')[:1].get()
     return manager.filter(**kwargs).reverse()[:1].get()
 
+  @classmethod
+  def _positional_through_entries(cls, kwargs):
+    """Returns the entries of the list identified by `kwargs` in the
+    intermediary model, for a model ordered with respect to a
+    ManyToManyField."""
+    through = cls._positional_through
+    return through._positional_order_manager.filter(**{
+      through._positional_order_with_respect_to[0]:
+        kwargs[cls._positional_order_with_respect_to[0]],
+    })
+
+  @classmethod
+  def _positional_through_elements(cls, kwargs):
+    """Returns the elements of the list identified by `kwargs` in list order,
+    for a model ordered with respect to a ManyToManyField. They are read with
+    a join driven by the index over the related object and position of the
+    intermediary model."""
+    through = cls._positional_through
+    # (The reverse relation of the intermediary model's foreign key to this
+    # model, which goes by the name of the intermediary model.)
+    name = through._meta.object_name.lower()
+    return cls._default_manager.filter(**{
+      '%s__%s' % (name, through._positional_order_with_respect_to[0]):
+        kwargs[cls._positional_order_with_respect_to[0]],
+    }).order_by('%s___position' % name)
+
+  @classmethod
+  def _positional_links(cls, *pks):
+    """Returns the primary keys of the elements before and after each of the
+    linked elements whose primary keys are `pks`, as read with a single
+    query, in a dictionary keyed on primary key."""
+    rows = cls._positional_order_manager.filter(pk__in=pks) \
+                                        .values_list('pk', '_prev', '_next')
+    return dict((row[0], row[1:]) for row in rows)
+
+  @classmethod
+  def _positional_relink(cls, prevs, nexts, *instances):
+    """Links each linked element whose primary key is a key of `prevs` to the
+    element before it given there, and each whose primary key is a key of
+    `nexts` to the element after it given there. Every link is written by a
+    single UPDATE statement, or by a few if the database limits the size of a
+    statement, and the links of `instances` are brought up to date."""
+    pks = list(set(prevs) | set(nexts))
+    if not pks:
+      return
+    qs = cls._positional_order_manager.all()
+    # Each element takes up to five parameters, rather than the three of a
+    # renumbered element:
+    batch_size = _position_case_batch_size(connections[qs.db])
+    batch_size = batch_size and batch_size * 3 // 5 or len(pks)
+    for start in xrange(0, len(pks), batch_size):
+      batch = pks[start:start+batch_size]
+      updates = {}
+      for name, links in (('_prev', prevs), ('_next', nexts)):
+        case = [(pk, links[pk]) for pk in batch if pk in links]
+        if case:
+          updates[name] = _PositionCase(cls, case, name)
+      qs.filter(pk__in=batch).update(**updates)
+    for obj in instances:
+      if obj.pk in prevs:
+        obj._prev_id = prevs[obj.pk]
+      if obj.pk in nexts:
+        obj._next_id = nexts[obj.pk]
+
+  @classmethod
+  def _positional_linked_end(cls, qs, name):
+    """Narrows the queryset `qs` of linked elements down to those which are
+    not linked to any element by their field `name` (`_prev` or `_next`),
+    and so are at the front or the back of their list. The column is tested
+    directly, as Django would join the table to itself to look for the
+    missing element."""
+    qn = connections[qs.db].ops.quote_name
+    return qs.extra(where=['%s.%s IS NULL' % (qn(cls._meta.db_table),
+                                              qn(cls._meta.get_field(name).column))])
+
+  @classmethod
+  def _positional_linked_sql(cls, kwargs, db, select):
+    """Returns the SQL and parameters of a query for the columns `select` of
+    the elements of the linked list identified by `kwargs`, in list order.
+    Starting from the element at the front of the list, the query follows the
+    links from each element to the next by a recursive common table
+    expression, driven by the index over `_prev`, so that the whole list is
+    read by a single query. The columns are qualified by the name of the
+    table, or refer to `chain.id`, the primary key of each element."""
+    connection = connections[db]
+    qn = connection.ops.quote_name
+    anchor = cls._positional_order_manager.filter(**kwargs)
+    anchor = cls._positional_linked_end(anchor, '_prev').order_by() \
+                                                        .values_list('pk')
+    anchor, params = anchor.query.sql_with_params()
+    # The statement starts with SELECT, as some drivers (such as Python's
+    # sqlite3 module) commit the current transaction before any statement
+    # which does not look like a query or a modification:
+    return ('SELECT %(select)s FROM ('
+              'WITH RECURSIVE chain (id, depth) AS ('
+                'SELECT anchor.%(pk)s, 0 FROM (%(anchor)s) anchor '
+                'UNION ALL '
+                'SELECT %(table)s.%(pk)s, chain.depth + 1 FROM %(table)s '
+                'INNER JOIN chain ON %(table)s.%(prev)s = chain.id) '
+              'SELECT id, depth FROM chain) chain '
+            'INNER JOIN %(table)s ON %(table)s.%(pk)s = chain.id '
+            'ORDER BY chain.depth' % {
+              'anchor': anchor,
+              'select': select,
+              'table': qn(cls._meta.db_table),
+              'pk': qn(cls._meta.pk.column),
+              'prev': qn(cls._meta.get_field('_prev').column),
+            }, params)
+
+  @classmethod
+  def _positional_linked_order(cls, kwargs):
+    """Returns the primary keys of the elements of the linked list identified
+    by `kwargs`, in list order. Where the database does not support recursive
+    queries the links of the whole list are read instead, and followed in
+    memory."""
+    qs = cls._positional_order_manager.filter(**kwargs)
+    connection = connections[qs.db]
+    if _supports_recursive_queries(connection):
+      sql, params = cls._positional_linked_sql(kwargs, qs.db, 'chain.id')
+      cursor = connection.cursor()
+      cursor.execute(sql, params)
+      return [cls._meta.pk.to_python(row[0]) for row in cursor.fetchall()]
+    nexts = dict(qs.values_list('_prev', 'pk'))
+    order, pk = [], nexts.get(None)
+    while pk is not None:
+      order.append(pk)
+      pk = nexts.get(pk)
+    return order
+
+  @classmethod
+  def _positional_linked_elements(cls, kwargs):
+    "Returns the elements of the linked list identified by `kwargs`, in order."
+    manager = cls._positional_order_manager
+    db = manager.all().db
+    if _supports_recursive_queries(connections[db]):
+      sql, params = cls._positional_linked_sql(kwargs, db,
+        '%s.*' % connections[db].ops.quote_name(cls._meta.db_table))
+      return list(manager.raw(sql, params))
+    order = cls._positional_linked_order(kwargs)
+    elements = manager.in_bulk(order)
+    return [elements[pk] for pk in order]
+
+  def _positional_linked_place(self, prev, next, links):
+    """Moves the linked element in between the elements whose primary keys
+    are `prev` and `next` (either of which may be None to stand for the
+    corresponding end of the list), which follow one another once the element
+    has been taken out of the list. `links` are the primary keys of the
+    elements before and after the element as it is."""
+    if (prev, next) == links:
+      return
+    old_prev, old_next = links
+    prevs, nexts = {self.pk: prev}, {self.pk: next}
+    if old_next is not None:
+      prevs[old_next] = old_prev
+    if old_prev is not None:
+      nexts[old_prev] = old_next
+    if next is not None:
+      prevs[next] = self.pk
+    if prev is not None:
+      nexts[prev] = self.pk
+    self._positional_relink(prevs, nexts, self)
+
+  def _positional_linked_swap(self, pk, *instances):
+    """Swaps the linked element with the element whose primary key is `pk`,
+    relinking the two elements and their neighbours."""
+    if pk == self.pk:
+      return
+    links = self._positional_links(self.pk, pk)
+    (self_prev, self_next), (other_prev, other_next) = links[self.pk], links[pk]
+    # Each of the two elements takes the place of the other, including where
+    # one of them is a neighbour of the other:
+    swapped = lambda x: {self.pk: pk, pk: self.pk}.get(x, x)
+    prevs = {self.pk: swapped(other_prev), pk: swapped(self_prev)}
+    nexts = {self.pk: swapped(other_next), pk: swapped(self_next)}
+    for neighbour, prev in ((self_next, pk), (other_next, self.pk)):
+      if neighbour not in (None, self.pk, pk):
+        prevs[neighbour] = prev
+    for neighbour, next in ((self_prev, pk), (other_prev, self.pk)):
+      if neighbour not in (None, self.pk, pk):
+        nexts[neighbour] = next
+    self._positional_relink(prevs, nexts, self, *instances)
+
+  @_positional_mutation
+  def _positional_linked_move_to_end(self, offset):
+    """Moves the linked element to the front of its list if `offset` is -1, or
+    to the back if it is 1."""
+    kwargs = self._positional_list_kwargs()
+    self._positional_lock(kwargs)
+    manager = self.__class__._positional_order_manager
+    end = manager.filter(**kwargs).exclude(pk=self.pk)
+    end = self._positional_linked_end(end, offset > 0 and '_next' or '_prev')
+    end = list(end.values_list('pk', flat=True)[:1])
+    if not end:
+      return
+    links = self._positional_links(self.pk)[self.pk]
+    if offset > 0:
+      self._positional_linked_place(end[0], None, links)
+    else:
+      self._positional_linked_place(None, end[0], links)
+
+  @classmethod
+  def _positional_base(cls, kwargs):
+    """Returns the position of the front of the list identified by `kwargs`
+    under dense numbering, which is the position of the element at index 0.
+    This is always 0 unless the list grows at the front, in which case it is
+    read from the list."""
+    if cls._positional_growth != 'front':
+      return 0
+    front = cls._positional_order_manager.filter(**kwargs) \
+                                         .values_list('_position', flat=True)
+    return (list(front[:1]) + [0])[0]
+
+  @classmethod
+  def _positional_list_key(cls, kwargs):
+    """Returns the key identifying the list selected by the filter keyword
+    arguments `kwargs`, as used by the position index."""
+    return _position_index_key(getattr(kwargs[field], 'pk', kwargs[field])
+      for field in cls._positional_order_with_respect_to)
+
+  @classmethod
+  def _positional_size(cls, kwargs):
+    """Returns the number of elements of the list identified by `kwargs`,
+    from its recorded length if the model keeps one."""
+    if cls._positional_length is None:
+      return cls._positional_order_manager.filter(**kwargs).count()
+    lengths = cls._positional_length.objects.filter(
+      list_key=cls._positional_list_key(kwargs),
+    ).values_list('length', flat=True)
+    return (list(lengths) + [0])[0]
+
+  @classmethod
+  def _positional_length_adjust(cls, key, delta):
+    "Adds `delta` to the length of the list identified by `key`."
+    _position_counter_add(cls._positional_length, {'list_key': key},
+                          'length', delta)
+
+  def _positional_length_save(self, adding):
+    """Brings the list lengths up to date after this element has been saved,
+    which only changes them if it has been added to or moved between lists.
+    The position index, if any, is left to bring `_positional_saved` up to
+    date."""
+    key = self._positional_index_key()
+    old_key = self._positional_saved[0]
+    if adding:
+      self._positional_length_adjust(key, 1)
+    elif old_key != key:
+      self._positional_length_adjust(old_key, -1)
+      self._positional_length_adjust(key, 1)
+    if self._positional_index is None:
+      self._positional_saved = (key, self._position)
+
+  @classmethod
+  def rebuild_position_length(cls):
+    """Recounts the length of every list from scratch, which is only
+    necessary if elements have been added or removed behind the mixin's
+    back."""
+    owrt = cls._positional_order_with_respect_to
+    qs = cls._positional_order_manager.order_by()
+    if owrt:
+      rows = qs.values_list(*owrt).annotate(models.Count('pk'))
+    else:
+      rows = [(qs.count(),)]
+    length = cls._positional_length
+    with transaction.commit_on_success():
+      length.objects.all().delete()
+      length.objects.bulk_create([
+        length(list_key=_position_index_key(row[:-1]), length=row[-1])
+        for row in rows if row[-1]])
+
+  @classmethod
+  def _positional_lock(cls, kwargs):
+    """Locks the list identified by `kwargs` until the end of the current
+    transaction, if the model has asked for position locking. How depends on
+    the database:
+
+      * PostgreSQL takes a transaction-level advisory lock keyed on the table
+        and the list, so that lists are locked even before they have any
+        elements.
+      * SQLite locks the whole database for writing, as BEGIN IMMEDIATE
+        would, by issuing an UPDATE which matches no rows.
+      * Other databases lock the rows of the related objects the list is
+        ordered with respect to (SELECT ... FOR UPDATE), or failing that the
+        elements of the list itself."""
+    if not cls._positional_locking:
+      return
+    db = router.db_for_write(cls)
+    connection = connections[db]
+    qn = connection.ops.quote_name
+    start = time.time()
+    if connection.vendor == 'postgresql':
+      connection.cursor().execute('SELECT pg_advisory_xact_lock(%s, %s)', [
+        zlib.crc32(cls._meta.db_table), zlib.crc32(cls._positional_list_key(kwargs))])
+    elif connection.vendor == 'sqlite':
+      column = qn(cls._meta.pk.column)
+      connection.cursor().execute('UPDATE %s SET %s = %s WHERE 0 = 1' %
+        (qn(cls._meta.db_table), column, column))
+    else:
+      locked = False
+      for name in cls._positional_order_with_respect_to:
+        try:
+          field = cls._meta.get_field(name)
+        except FieldDoesNotExist:
+          continue
+        if isinstance(field, models.ForeignKey) and kwargs[name] is not None:
+          related = field.rel.to._default_manager.using(db)
+          list(related.select_for_update().values_list('pk')
+                      .filter(pk=getattr(kwargs[name], 'pk', kwargs[name])))
+          locked = True
+      if not locked:
+        manager = cls._positional_order_manager.db_manager(db)
+        list(manager.select_for_update().filter(**kwargs).values_list('pk'))
+    # Account for the wait in the report of the operation, if one is made:
+    statistics = getattr(connection, '_positional_statistics', None)
+    if statistics is not None:
+      statistics.lock_wait += time.time() - start
+
+  @classmethod
+  def _positional_shift(cls, kwargs, start, stop, delta):
+    """Adds `delta` to the `_position` of every element of the list identified
+    by `kwargs` whose position lies within the half-open range [start, stop),
+    using one UPDATE statement. A `stop` of None leaves the range unbounded."""
+    qs = cls._positional_order_manager.filter(_position__gte=start, **kwargs)
+    if stop is not None:
+      qs = qs.filter(_position__lt=stop)
+    qs.update(_position=models.F('_position') + delta)
+
+  @classmethod
+  def _positional_key_between(cls, lower, upper):
+    """Returns a position strictly between the positions `lower` and `upper`,
+    either of which may be None to stand for the corresponding end of the
+    list, or None if there is no such position free."""
+    if cls._positional_keys == 'lexicographic':
+      return _lexicographic_key_between(lower, upper)
+    spacing = cls._positional_spacing
+    if lower is None and upper is None:
+      return 0
+    if lower is None:
+      return upper - spacing
+    if upper is None:
+      return lower + spacing
+    if upper - lower > 1:
+      return lower + (upper - lower) // 2
+    return None
+
+  @classmethod
+  def _positional_keys_between(cls, lower, upper, count):
+    """Returns a list of `count` ascending positions spread out evenly between
+    `lower` and `upper` (either of which may be None), or None if they would
+    be packed too closely--for integer positions, closer than half the
+    configured spacing. There is always room towards an open end."""
+    if cls._positional_keys == 'lexicographic':
+      return _lexicographic_keys_between(lower, upper, count)
+    spacing = cls._positional_spacing
+    if lower is None and upper is None:
+      return [spacing*idx for idx in xrange(count)]
+    if lower is None:
+      return [upper - spacing*(count-idx) for idx in xrange(count)]
+    if upper is None:
+      return [lower + spacing*(idx+1) for idx in xrange(count)]
+    step = (upper - lower) // (count + 1)
+    if step < max(1, spacing // 2):
+      return None
+    return [lower + step*(idx+1) for idx in xrange(count)]
+
+  def _positional_rebalance(self, kwargs, lower, upper, moving=None):
+    """Renumbers the neighbourhood of the (exhausted) gap between the sparse
+    positions `lower` and `upper`, returning a position which has been freed
+    up in between them for this element. If the primary keys of a number of
+    elements are given as `moving` instead, a list of as many positions is
+    returned.
+
+    The neighbourhood starts out as the two elements either side of the gap,
+    and doubles in size until its elements can be spread out comfortably in
+    between the elements which bound it. Once it reaches an end of the list
+    there is always room."""
+    manager = self.__class__._positional_order_manager
+    others = manager.filter(**kwargs).exclude(pk__in=moving or [self.pk])
+    slots = [(None, None)] * len(moving or [self.pk])
+    width = 1
+    while True:
+      before, after = [], []
+      if lower is not None:
+        before = list(others.filter(_position__lte=lower).reverse()
+                            .values_list('pk', '_position')[:width+1])
+      if upper is not None:
+        after = list(others.filter(_position__gte=upper)
+                           .values_list('pk', '_position')[:width+1])
+      # The elements just beyond the neighbourhood, if any, bound it:
+      bottom, top = None, None
+      if len(before) > width:
+        bottom = before.pop()[1]
+      if len(after) > width:
+        top = after.pop()[1]
+      # Lay out the neighbourhood in list order, with None as a stand-in for
+      # this element (or the elements being moved):
+      window = list(reversed(before)) + slots + after
+      keys = self._positional_keys_between(bottom, top, len(window))
+      if keys is not None:
+        break
+      width *= 2
+
+    # Write out the new positions of the elements which actually moved:
+    deltas, positions = {}, []
+    for (pk, old), new in zip(window, keys):
+      if pk is None:
+        positions.append(new)
+      elif old != new:
+        others.filter(pk=pk).update(_position=new)
+        if self._positional_index is not None:
+          for bucket, delta in ((self._positional_bucket(old), -1),
+                                (self._positional_bucket(new), 1)):
+            deltas[bucket] = deltas.get(bucket, 0) + delta
+    # Apply the net change to the position index, if there is one:
+    key = deltas and self._positional_index_key()
+    for bucket, delta in deltas.iteritems():
+      if delta:
+        self._positional_index_adjust(key, bucket, delta)
+    if moving is None:
+      return positions[0]
+    return positions
+
+  @_positional_mutation
+  def _positional_place(self, kwargs, lower, upper):
+    """Moves this element in between its would-be neighbours at the sparse
+    positions `lower` and `upper`, either of which may be None to stand for
+    the corresponding end of the list. Only this element is written, unless
+    the gap has been exhausted."""
+    self._positional_lock(kwargs)
+    # Early exit if the element is already in place:
+    if (lower is None or lower < self._position) and \
+       (upper is None or self._position < upper):
+      return
+    self._positional_load_saved()
+    position = self._positional_key_between(lower, upper)
+    if position is None:
+      position = self._positional_rebalance(kwargs, lower, upper)
+    self._position = position
+    # Only `_position` is written, unless the element has yet to be saved:
+    if self._state.adding:
+      return self.save()
+    manager = self.__class__._positional_order_manager
+    manager.filter(pk=self.pk).update(_position=position)
+    if self._positional_index is not None:
+      self._positional_index_save(False)
+
+  @classmethod
+  def _positional_bucket(cls, position):
+    "Returns the position index bucket which `position` falls into."
+    if cls._positional_keys == 'lexicographic':
+      position = int(position[:_LEXICOGRAPHIC_INTEGER_WIDTH],
+                     len(_LEXICOGRAPHIC_DIGITS))
+      return position // _POSITION_INDEX_BUCKET
+    return position // (cls._positional_spacing * _POSITION_INDEX_BUCKET)
+
+  @classmethod
+  def _positional_bucket_filter(cls, bucket):
+    """Returns the filter keyword arguments matching the positions which fall
+    into position index bucket `bucket`."""
+    if cls._positional_keys == 'lexicographic':
+      start = bucket * _POSITION_INDEX_BUCKET
+      kwargs = {'_position__gte': _lexicographic_encode(start)}
+      stop = start + _POSITION_INDEX_BUCKET
+      if stop < len(_LEXICOGRAPHIC_DIGITS) ** _LEXICOGRAPHIC_INTEGER_WIDTH:
+        kwargs['_position__lt'] = _lexicographic_encode(stop)
+      return kwargs
+    width = cls._positional_spacing * _POSITION_INDEX_BUCKET
+    return {
+      '_position__gte': bucket * width,
+      '_position__lt': (bucket + 1) * width,
+    }
+
+  @classmethod
+  def _positional_index_adjust(cls, key, bucket, delta):
+    """Adds `delta` to the count of the elements of the list identified by
+    `key` which fall into position index bucket `bucket`."""
+    _position_counter_add(cls._positional_index,
+                          {'list_key': key, 'bucket': bucket}, 'count', delta)
+
+  def _positional_index_key(self):
+    "Returns the key identifying this element's list in the position index."
+    return _position_index_key(
+      getattr(self, attname) for attname in self._positional_list_attnames)
+
+  def _positional_index_save(self, adding):
+    """Brings the position index up to date after this element has been
+    saved."""
+    key = self._positional_index_key()
+    bucket = self._positional_bucket(self._position)
+    old_key, old_position = self._positional_saved
+    if adding or old_position is None:
+      self._positional_index_adjust(key, bucket, 1)
+    else:
+      old_bucket = self._positional_bucket(old_position)
+      if (old_key, old_bucket) != (key, bucket):
+        self._positional_index_adjust(old_key, old_bucket, -1)
+        self._positional_index_adjust(key, bucket, 1)
+    self._positional_saved = (key, self._position)
+
+  def _positional_index_of(self):
+    """Returns the index of this element within its list, using the position
+    index."""
+    index = self._positional_index
+    bucket = self._positional_bucket(self._position)
+    before = index.objects.filter(
+      list_key=self._positional_index_key(), bucket__lt=bucket,
+    ).aggregate(total=models.Sum('count'))['total'] or 0
+    manager = self.__class__._positional_order_manager
+    return before + manager.filter(**self._positional_list_kwargs()) \
+                           .filter(**self._positional_bucket_filter(bucket)) \
+                           .filter(_position__lt=self._position).count()
+
+  def _positional_index_at(self, idx):
+    """Returns the element at index `idx` of this element's list, using the
+    position index."""
+    index = self._positional_index
+    if idx >= 0:
+      buckets = index.objects.filter(
+        list_key=self._positional_index_key(), count__gt=0,
+      ).order_by('bucket').values_list('bucket', 'count')
+      for bucket, count in buckets.iterator():
+        if idx < count:
+          manager = self.__class__._positional_order_manager
+          qs = manager.filter(**self._positional_list_kwargs()) \
+                      .filter(**self._positional_bucket_filter(bucket))
+          return qs[idx:idx+1].get()
+        idx -= count
+    raise self.DoesNotExist(_(u"%s matching query does not exist.")
+                            % self._meta.object_name)
+
+  @classmethod
+  def rebuild_position_index(cls):
+    """Recomputes the position index from scratch, which is only necessary if
+    positions have been modified behind the mixin's back."""
+    counts = {}
+    fields = cls._positional_order_with_respect_to + ('_position',)
+    rows = cls._positional_order_manager.order_by().values_list(*fields)
+    for row in rows.iterator():
+      key = (_position_index_key(row[:-1]), cls._positional_bucket(row[-1]))
+      counts[key] = counts.get(key, 0) + 1
+    index = cls._positional_index
+    with transaction.commit_on_success():
+      index.objects.all().delete()
+      index.objects.bulk_create([
+        index(list_key=key, bucket=bucket, count=count)
+        for (key, bucket), count in counts.iteritems()])
+
   def get_object_at_offset(self, offset):
     "Get the object whose position is `offset` positions away from my own."
-    kwargs = self.get_positional_list_kwargs()
+    # Answer from the elements read along with this one, if possible:
+    if self._positional_window is not None:
+      elements, idx, at_front, at_back = self._positional_window
+      idx += offset
+      if 0 <= idx < len(elements):
+        return elements[idx]
+      if (idx < 0 and at_front) or (idx >= len(elements) and at_back):
+        raise self.DoesNotExist(_(u"%s matching query does not exist.")
+                                % self._meta.object_name)
+    kwargs = self._positional_list_kwargs()
     manager = self.__class__._positional_order_manager
-    return manager.get(_position = self._position + offset, **kwargs)
+    if self._positional_keys == 'linked':
+      # Follow the links from this element, one element at a time:
+      obj = self
+      if not offset:
+        return manager.get(pk=self.pk)
+      for step in xrange(abs(offset)):
+        if offset > 0:
+          obj = manager.get(pk=obj._next_id)
+        else:
+          obj = manager.get(pk=obj._prev_id)
+      return obj
+    if self._positional_dense:
+      return manager.get(_position = self._position + offset, **kwargs)
+    if not offset:
+      return manager.get(_position = self._position, **kwargs)
+    if self._positional_index is not None:
+      return self._positional_index_at(self._positional_index_of() + offset)
+    # Under sparse numbering, count off elements from this one:
+    if offset > 0:
+      qs = manager.filter(_position__gt=self._position, **kwargs)
+    else:
+      qs = manager.filter(_position__lt=self._position, **kwargs).reverse()
+    return qs[abs(offset)-1:abs(offset)].get()
+
+  def _positional_neighbour(self, name):
+    """Returns the neighbour whose primary key this element was annotated
+    with as `name` by `with_neighbours()`, or None if there is none."""
+    pk = getattr(self, name)
+    if pk is None:
+      return None
+    return self.__class__._positional_order_manager.get(pk=pk)
 
   def get_next(self):
     """Return the element immediately following this one, or None at the end
     of the list."""
+    if self._positional_window is None and \
+       'positional_next_pk' in self.__dict__:
+      return self._positional_neighbour('positional_next_pk')
     try:
       return self.get_object_at_offset(1)
     except self.DoesNotExist:
@@ -233,143 +1898,1036 @@ class PositionalOrderMixin(models.Model):
   def get_prev(self):
     """Return the element immediately prior to this one, or None at the start
     of the list."""
+    if self._positional_window is None and \
+       'positional_prev_pk' in self.__dict__:
+      return self._positional_neighbour('positional_prev_pk')
     try:
       return self.get_object_at_offset(-1)
     except self.DoesNotExist:
       return None
 
+  def iter_from(self, direction=1, window=100):
+    """Iterates over the list starting with this element, towards the back of
+    the list if `direction` is 1 or towards the front if it is -1. Elements
+    are read `window` at a time, and each element remembers the others read
+    along with it, so that `get_next()`, `get_prev()` and
+    `get_object_at_offset()` answer from memory for as long as they stay
+    within the same window. Windows overlap by one element, so that the
+    neighbour in the direction of travel is always at hand. A window reflects
+    the list as it was read; an element forgets its window once it is itself
+    modified. A linked list is read as a whole instead, as a single window."""
+    if direction not in (1, -1):
+      raise ValueError, _(u"direction must be either 1 or -1.")
+    if window < 1:
+      raise ValueError, _(u"window must be a positive integer.")
+    kwargs = self._positional_list_kwargs()
+    if self._positional_keys == 'linked':
+      elements = self._positional_linked_elements(kwargs)
+      idx = map(lambda x: x.pk, elements).index(self.pk)
+      elements[idx] = self
+      elements = tuple(elements)
+      for obj_idx, obj in enumerate(elements):
+        obj._positional_window = (elements, obj_idx, True, True)
+      if direction > 0:
+        return iter(elements[idx:])
+      return iter(elements[idx::-1])
+    return self._positional_iter_from(kwargs, direction, window)
+
+  def _positional_iter_from(self, kwargs, direction, window):
+    "Implements iter_from() for positions."
+    manager = self.__class__._positional_order_manager
+    anchor = self
+    while True:
+      if direction > 0:
+        qs = manager.filter(_position__gt=anchor._position, **kwargs)
+      else:
+        qs = manager.filter(_position__lt=anchor._position, **kwargs).reverse()
+      rows = list(qs[:window])
+      end = len(rows) < window
+      # Lay out the window in list order, and hand it to its elements:
+      elements = [anchor] + rows
+      if direction < 0:
+        elements.reverse()
+      elements = tuple(elements)
+      for idx, obj in enumerate(elements):
+        obj._positional_window = (elements, idx,
+                                  end and direction < 0, end and direction > 0)
+      # The last element read is left for the next window to start from,
+      # unless this is the end of the list:
+      if end:
+        for obj in [anchor] + rows:
+          yield obj
+        return
+      for obj in [anchor] + rows[:-1]:
+        yield obj
+      anchor = rows[-1]
+
+  @_positional_operation
   def move_down(self):
     "Move element down one position."
-    # Get the element after this one.
-    one_after = self.get_next()
-    if one_after is not None:
-      # Swap this element with the one that follows.
-      self.swap(one_after)
+    self._positional_step(1)
 
+  @_positional_operation
   def move_up(self):
     "Move element up one position."
-    # Get the element before this one.
-    one_before = self.get_prev()
-    if one_before is not None:
-      # Swap this element with the one prior.
-      self.swap(one_before)
+    self._positional_step(-1)
 
+  @_positional_mutation
+  def _positional_step(self, offset):
+    """Swaps this element with its neighbour `offset` (1 or -1) positions
+    away, if there is one, without loading the neighbour."""
+    kwargs = self._positional_list_kwargs()
+    self._positional_lock(kwargs)
+    manager = self.__class__._positional_order_manager
+    if self._positional_keys == 'linked':
+      neighbour = self._positional_links(self.pk)[self.pk][offset > 0]
+      if neighbour is not None:
+        self._positional_linked_swap(neighbour)
+      return
+    if self._positional_dense:
+      # The neighbour's position is known, so both elements are moved by a
+      # single UPDATE of the two positions involved:
+      position = self._position + offset
+      if position < 0 and self._positional_growth != 'front':
+        return
+      lower = min(self._position, position)
+      shifts = [(self._position, self._position + 1, offset),
+                (position, position + 1, -offset)]
+      if manager.filter(_position__gte=lower, _position__lt=lower + 2,
+                        **kwargs).update(_position=_PositionShiftCase(shifts)) < 2:
+        # There was no element to swap with at the back of the list, so only
+        # this element moved. Put it back again:
+        manager.filter(_position=position, **kwargs) \
+               .update(_position=self._position)
+        return
+      self._position = position
+      return
+
+    # Otherwise only the neighbour's position needs to be read:
+    if offset > 0:
+      qs = manager.filter(_position__gt=self._position, **kwargs)
+    else:
+      qs = manager.filter(_position__lt=self._position, **kwargs).reverse()
+    neighbour = list(qs.values_list('pk', '_position')[:1])
+    if not neighbour:
+      return
+    pk, position = neighbour[0]
+    manager.filter(pk__in=[self.pk, pk]).update(_position=_PositionCase(
+      self.__class__, [(self.pk, position), (pk, self._position)]))
+    # The two elements trade places within a single list, which leaves the
+    # counts of the position index as they were:
+    self._position = position
+    if self._positional_index is not None:
+      self._positional_saved = (self._positional_saved[0], position)
+
+  @_positional_operation
   def move_to_front(self):
     "Move element to the front of the list."
+    if self._positional_keys == 'linked':
+      return self._positional_linked_move_to_end(-1)
     return self.insert_at(0)
 
+  @_positional_operation
   def move_to_back(self):
     "Move element to the end of the list."
-    kwargs = self.get_positional_list_kwargs()
-    return self.insert_at(self.get_back(**kwargs)._position)
+    if self._positional_keys == 'linked':
+      return self._positional_linked_move_to_end(1)
+    return self._positional_move_to_back()
 
-  @transaction.commit_on_success
+  @_positional_mutation
+  def _positional_move_to_back(self):
+    """Implements move_to_back() for numbered elements, finding the back of
+    the list once it is locked, so that an element appended in the meantime
+    is not left behind the moved one."""
+    kwargs = self._positional_list_kwargs()
+    self._positional_lock(kwargs)
+    if not self._positional_dense:
+      manager = self.__class__._positional_order_manager
+      back = manager.filter(**kwargs).exclude(pk=self.pk).reverse()
+      back = list(back.values_list('_position', flat=True)[:1]) + [None]
+      return self._positional_place(kwargs, back[0], None)
+    return self.insert_at(self._positional_size(kwargs) - 1)
+
+  @_positional_operation
+  @_positional_mutation
   def insert_at(self, position):
     "Moves the object to a specified position."
-    kwargs = self.get_positional_list_kwargs()
+    kwargs = self._positional_list_kwargs()
+    self._positional_lock(kwargs)
     manager = self.__class__._positional_order_manager
+    # A linked element finds its new neighbours from the order of the list:
+    if self._positional_keys == 'linked':
+      order = self._positional_linked_order(kwargs)
+      if not position in xrange(0, len(order)):
+        raise IndexError, _(u"invalid position")
+      order.remove(self.pk)
+      order = [None] + order + [None]
+      return self._positional_linked_place(order[position],
+        order[position+1], self._positional_links(self.pk)[self.pk])
+    # Under sparse numbering the element only needs to find its place in
+    # between its new neighbours:
+    if not self._positional_dense:
+      return self._positional_insert_at(kwargs, position)
+
     # Get the size of the list:
-    size = manager.filter(**kwargs).count()
+    size = self._positional_size(kwargs)
 
     # Early exits:
-    if self._position == position:
-      return
     if not position in xrange(0, size):
       raise IndexError, _(u"invalid position")
+    position += self._positional_base(kwargs)
+    if self._position == position:
+      return
+    self._positional_move_to(kwargs, position)
 
-    # Move the element to be inserted out of the way, so we have an empty cell
-    # to work with.
-    old_position = self._position
-    self._position = size
-    self.save()
+  def _positional_move_to(self, kwargs, position):
+    """Moves the element to the position `position` of its list under dense
+    numbering, which must be occupied by an element of the list."""
+    manager = self.__class__._positional_order_manager
 
-    # Shift each item in between the two positions over by one, to compensate
-    # for the move.
+    # Move the element, and shift each item in between the two positions over
+    # by one to compensate. This is a single set-based UPDATE of `_position`
+    # alone, which matches every row against its original position, so the
+    # cost in queries is the same no matter how far the element travels and
+    # there is no need to park the element anywhere in between.
+    old_position = self._position
     if position < old_position:
-      idx = 1
-      qs = manager.filter(**kwargs).filter(
-        _position__gte = position,
-        _position__lt = old_position,
-      ).order_by('-_position')
+      start, stop, delta = position, old_position, 1
     else:
-      idx = -1
-      qs = manager.filter(**kwargs).filter(
-        _position__gt = old_position,
-        _position__lte = position,
-      ).order_by('_position')
-    for element in qs:
-      element._position += idx
-      element.save()
-
-    # Assign the element to the now-empty cell.
+      start, stop, delta = old_position + 1, position + 1, -1
+    manager.filter(
+      _position__gte=min(start, old_position),
+      _position__lt=max(stop, old_position + 1),
+      **kwargs
+    ).update(_position=_PositionShiftCase([
+      (start, stop, delta),
+      (old_position, old_position + 1, position - old_position),
+    ]))
     self._position = position
-    self.save()
 
+  def _positional_insert_at(self, kwargs, position):
+    "Implements insert_at() for sparse or lexicographic positions."
+    manager = self.__class__._positional_order_manager
+    others = manager.filter(**kwargs).exclude(pk=self.pk)
+    others = others.values_list('_position', flat=True)
+    if self._positional_index is None:
+      if not position in xrange(0, self._positional_size(kwargs)):
+        raise IndexError, _(u"invalid position")
+      if position:
+        keys = list(others[position-1:position+1]) + [None]
+        return self._positional_place(kwargs, keys[0], keys[1])
+      else:
+        keys = list(others[:1]) + [None]
+        return self._positional_place(kwargs, None, keys[0])
+
+    # With a position index, look up the would-be predecessor by its index
+    # (accounting for this element), and the successor by its position:
+    if position < 0:
+      raise IndexError, _(u"invalid position")
+    lower = None
+    if position:
+      idx = position - 1
+      if idx >= self._positional_index_of():
+        idx += 1
+      try:
+        lower = self._positional_index_at(idx)._position
+      except self.DoesNotExist:
+        raise IndexError, _(u"invalid position")
+      others = others.filter(_position__gt=lower)
+    upper = list(others[:1]) + [None]
+    # With neither a predecessor nor a successor the list is either empty, or
+    # holds only this element, which is then already in place:
+    if lower is None and upper[0] is None and self._position is None:
+      raise IndexError, _(u"invalid position")
+    return self._positional_place(kwargs, lower, upper[0])
+
+  @_positional_operation
+  @_positional_mutation
   def insert_before(self, other):
     """Inserts an object in the database so that it will be ordered just
     before the `other` object - this has to be of the same type, of course."""
-    # we only need to call another method and prepare the proper parameters
+    if self._positional_keys == 'linked':
+      if self.pk == other.pk:
+        return
+      self._positional_lock(self._positional_list_kwargs())
+      links = self._positional_links(self.pk, other.pk)
+      if links[other.pk][0] != self.pk:
+        self._positional_linked_place(links[other.pk][0], other.pk,
+                                      links[self.pk])
+      return
+    if not self._positional_dense:
+      if self.pk == other.pk:
+        return
+      kwargs = self._positional_list_kwargs()
+      self._positional_lock(kwargs)
+      manager = self.__class__._positional_order_manager
+      lower = manager.filter(_position__lt=other._position, **kwargs) \
+                     .exclude(pk=self.pk).reverse()
+      lower = list(lower.values_list('_position', flat=True)[:1]) + [None]
+      return self._positional_place(kwargs, lower[0], other._position)
+    # Under dense numbering the element takes the position of `other`, or the
+    # one before it if the element itself makes room by leaving from in front:
+    kwargs = self._positional_list_kwargs()
+    self._positional_lock(kwargs)
     if self._position < other._position:
-      self.insert_at(other._position - 1)
+      position = other._position - 1
     else:
-      self.insert_at(other._position)
+      position = other._position
+    if self._position != position:
+      self._positional_move_to(kwargs, position)
 
+  @_positional_operation
+  @_positional_mutation
   def insert_after(self, other):
     """Inserts an object in the database so that it will be ordered just
     behind the `other` object - this has to be of the same type, of course."""
-    # we only need to call another method and prepare the proper parameters
+    if self._positional_keys == 'linked':
+      if self.pk == other.pk:
+        return
+      self._positional_lock(self._positional_list_kwargs())
+      links = self._positional_links(self.pk, other.pk)
+      if links[other.pk][1] != self.pk:
+        self._positional_linked_place(other.pk, links[other.pk][1],
+                                      links[self.pk])
+      return
+    if not self._positional_dense:
+      if self.pk == other.pk:
+        return
+      kwargs = self._positional_list_kwargs()
+      self._positional_lock(kwargs)
+      manager = self.__class__._positional_order_manager
+      upper = manager.filter(_position__gt=other._position, **kwargs) \
+                     .exclude(pk=self.pk)
+      upper = list(upper.values_list('_position', flat=True)[:1]) + [None]
+      return self._positional_place(kwargs, other._position, upper[0])
+    # Likewise the element takes the position of `other` or the one after it:
+    kwargs = self._positional_list_kwargs()
+    self._positional_lock(kwargs)
     if self._position <= other._position:
-      self.insert_at(other._position)
+      position = other._position
+    else:
+      position = other._position + 1
+    if self._position != position:
+      self._positional_move_to(kwargs, position)
+
+  @classmethod
+  @_positional_operation
+  @_positional_mutation
+  def move_many(cls, objs, before=None, after=None, position=None):
+    """Moves the elements `objs`, which must all belong to the same list, so
+    that they follow one another immediately before the element `before`,
+    immediately after the element `after`, or starting at index `position`
+    of the list--exactly one of which must be given. The moved elements keep
+    their relative order. The new layout of the list is worked out once, and
+    then written by a single UPDATE statement however many elements move
+    (unless sparse positions have to be renumbered)."""
+    if len(filter(lambda x: x is not None, (before, after, position))) != 1:
+      raise ValueError, _(u"move_many() requires exactly one of before, after and position.")
+    # Arrange the elements in list order, without duplicates:
+    objs = dict((obj.pk, obj) for obj in objs).values()
+    if cls._positional_keys != 'linked':
+      objs.sort(key=lambda x: x._position)
+    if not objs:
+      return
+    kwargs = objs[0]._positional_list_kwargs()
+    if filter(lambda x: x._positional_list_kwargs() != kwargs, objs):
+      raise ValueError, _(u"move_many() requires elements of a single list.")
+    cls._positional_lock(kwargs)
+    target = after
+    if before is not None:
+      target = before
+    if target is not None:
+      if target._positional_list_kwargs() != kwargs:
+        raise ValueError, _(u"move_many() requires elements of a single list.")
+      if target.pk in map(lambda x: x.pk, objs):
+        raise ValueError, _(u"move_many() cannot move elements next to one of themselves.")
+
+    manager = cls._positional_order_manager
+    if cls._positional_keys == 'linked':
+      return cls._positional_linked_move_many(kwargs, objs, before, after,
+                                              position)
+    if not cls._positional_dense:
+      return cls._positional_move_many(kwargs, objs, before, after, position)
+
+    # Work out the index at which the moved elements start once they have
+    # been removed from the list and then put back in. The layout is worked
+    # out in terms of indices, which are offset from the positions by the
+    # position of the front of the list:
+    size = manager.filter(**kwargs).count()
+    base = cls._positional_base(kwargs)
+    old_positions = map(lambda x: x._position - base, objs)
+    if target is not None:
+      start = target._position - base - \
+        len(filter(lambda x: x < target._position - base, old_positions))
+      if after is not None:
+        start += 1
+    else:
+      start = position
+      if not start in xrange(0, size - len(objs) + 1):
+        raise IndexError, _(u"invalid position")
+
+    # Each moved element is shifted to its new position. The elements in
+    # between two moved elements are shifted back by the number of moved
+    # elements which preceded them, and then forward by the number of moved
+    # elements if they end up after the moved elements:
+    shifts = []
+    for idx, old_position in enumerate(old_positions):
+      shifts.append((old_position, old_position + 1,
+                     start + idx - old_position))
+    bounds = [-1] + old_positions + [size]
+    for idx in xrange(0, len(bounds) - 1):
+      lower, upper = bounds[idx] + 1, bounds[idx+1]
+      split = min(max(start + idx, lower), upper)
+      for range_start, range_stop, delta in ((lower, split, -idx),
+          (split, upper, len(objs) - idx)):
+        if range_start < range_stop and delta:
+          shifts.append((range_start, range_stop, delta))
+    shifts = [(range_start + base, range_stop + base, delta)
+              for range_start, range_stop, delta in shifts if delta]
+    if shifts:
+      manager.filter(
+        _position__gte=min(map(lambda x: x[0], shifts)),
+        _position__lt=max(map(lambda x: x[1], shifts)),
+        **kwargs
+      ).update(_position=_PositionShiftCase(shifts))
+    for idx, obj in enumerate(objs):
+      obj._position = base + start + idx
+
+  @classmethod
+  def _positional_linked_move_many(cls, kwargs, objs, before, after, position):
+    """Implements move_many() for linked elements. The new order of the list
+    is worked out from its current order, and only the links which differ
+    between the two are written."""
+    order = cls._positional_linked_order(kwargs)
+    index = dict((pk, idx) for idx, pk in enumerate(order))
+    objs.sort(key=lambda x: index[x.pk])
+    moved = set(map(lambda x: x.pk, objs))
+    rest = filter(lambda x: x not in moved, order)
+    if before is not None:
+      start = rest.index(before.pk)
+    elif after is not None:
+      start = rest.index(after.pk) + 1
+    else:
+      start = position
+      if not start in xrange(0, len(rest) + 1):
+        raise IndexError, _(u"invalid position")
+    old_links = _chain_links(order)
+    new_links = _chain_links(rest[:start] + map(lambda x: x.pk, objs) +
+                             rest[start:])
+    prevs, nexts = {}, {}
+    for pk, (prev, next) in new_links.iteritems():
+      if prev != old_links[pk][0]:
+        prevs[pk] = prev
+      if next != old_links[pk][1]:
+        nexts[pk] = next
+    cls._positional_relink(prevs, nexts, *objs)
+
+  @classmethod
+  def _positional_move_many(cls, kwargs, objs, before, after, position):
+    "Implements move_many() for sparse or lexicographic positions."
+    manager = cls._positional_order_manager
+    pks = map(lambda x: x.pk, objs)
+    others = manager.filter(**kwargs).exclude(pk__in=pks)
+    others = others.values_list('_position', flat=True)
+
+    # Find the would-be neighbours of the moved elements:
+    if before is not None:
+      lower = others.filter(_position__lt=before._position).reverse()
+      lower, upper = (list(lower[:1]) + [None])[0], before._position
+    elif after is not None:
+      upper = others.filter(_position__gt=after._position)
+      lower, upper = after._position, (list(upper[:1]) + [None])[0]
+    else:
+      if not position in xrange(0, others.count() + 1):
+        raise IndexError, _(u"invalid position")
+      if position:
+        keys = list(others[position-1:position+1]) + [None]
+        lower, upper = keys[0], keys[1]
+      else:
+        lower, upper = None, (list(others[:1]) + [None])[0]
+
+    # Place the moved elements evenly in between, renumbering the
+    # neighbourhood if there is not enough room:
+    positions = cls._positional_keys_between(lower, upper, len(objs))
+    if positions is None:
+      positions = objs[0]._positional_rebalance(kwargs, lower, upper, pks)
+    qs = manager.filter(**kwargs)
+    batch_size = _position_case_batch_size(connections[qs.db]) or len(objs)
+    for start in xrange(0, len(objs), batch_size):
+      batch = zip(pks, positions)[start:start+batch_size]
+      qs.filter(pk__in=[pk for pk, new in batch]) \
+        .update(_position=_PositionCase(cls, batch))
+
+    # Bring the position index up to date, if there is one:
+    if cls._positional_index is not None:
+      deltas = {}
+      for obj, new in zip(objs, positions):
+        for bucket, delta in ((cls._positional_bucket(obj._position), -1),
+                              (cls._positional_bucket(new), 1)):
+          deltas[bucket] = deltas.get(bucket, 0) + delta
+      key = objs[0]._positional_index_key()
+      for bucket, delta in deltas.iteritems():
+        if delta:
+          cls._positional_index_adjust(key, bucket, delta)
+    for obj, new in zip(objs, positions):
+      obj._position = new
+      if cls._positional_index is not None:
+        obj._positional_saved = (obj._positional_saved[0], new)
+
+  @_positional_operation
+  @_positional_mutation
+  def move_to_list(self, new_key, position=None):
+    """Moves the element to another list, identified by `new_key`--a
+    dictionary of filter keyword arguments as returned by
+    `get_positional_list_kwargs()`, a tuple of the values of the
+    `order_with_respect_to` fields, or the value of the only such field. The
+    element is inserted at index `position` of the new list, which may be the
+    length of the list, or appended to it by default.
+
+    The gap the element leaves in its old list is closed and room is made
+    for it in the new list by one ranged UPDATE each under dense numbering,
+    and the element itself is written by a single UPDATE. Both lists are
+    locked, always in the same order, so that two elements moved the
+    opposite way between the same two lists at the same time cannot
+    deadlock."""
+    cls = self.__class__
+    owrt = cls._positional_order_with_respect_to
+    if cls._positional_through is not None:
+      raise ValueError, _(u"move_to_list() does not support elements ordered with respect to a ManyToManyField.")
+    if isinstance(new_key, dict):
+      new_kwargs = _match_args(owrt, **new_key)
+    elif isinstance(new_key, (tuple, list)):
+      new_kwargs = _match_args(owrt, *new_key)
+    else:
+      new_kwargs = _match_args(owrt, new_key)
+    if sorted(new_kwargs) != sorted(owrt):
+      raise ValueError, _(u"move_to_list() requires a value for each of the order_with_respect_to fields.")
+    old_kwargs = self._positional_list_kwargs()
+
+    # Within the same list this is just a move:
+    if cls._positional_list_key(old_kwargs) == \
+       cls._positional_list_key(new_kwargs):
+      if position is None:
+        return self.move_to_back()
+      return self.insert_at(position)
+
+    for kwargs in sorted([old_kwargs, new_kwargs], key=cls._positional_list_key):
+      cls._positional_lock(kwargs)
+    manager = cls._positional_order_manager
+
+    if cls._positional_keys == 'linked':
+      links = self._positional_links(self.pk)[self.pk]
+      if position is None:
+        back = cls._positional_linked_end(manager.filter(**new_kwargs),
+                                          '_next')
+        back = list(back.values_list('pk', flat=True)[:1])
+        prev, next = (back + [None])[0], None
+      else:
+        order = cls._positional_linked_order(new_kwargs)
+        if not position in xrange(0, len(order) + 1):
+          raise IndexError, _(u"invalid position")
+        order = [None] + order + [None]
+        prev, next = order[position], order[position+1]
+      manager.filter(pk=self.pk).update(_prev=prev, _next=next,
+                                        **self._positional_set_list(new_kwargs))
+      # Link the old neighbours to one another, and the new ones to the
+      # element:
+      prevs, nexts = {}, {}
+      if links[1] is not None:
+        prevs[links[1]] = links[0]
+      if links[0] is not None:
+        nexts[links[0]] = links[1]
+      if next is not None:
+        prevs[next] = self.pk
+      if prev is not None:
+        nexts[prev] = self.pk
+      self._positional_relink(prevs, nexts)
+      self._prev_id, self._next_id = prev, next
+      return
+
+    old_position = self._position
+    self._positional_load_saved()
+    if cls._positional_dense:
+      # Make room in the new list by shifting the elements from the new
+      # position onwards back by one:
+      size = self._positional_size(new_kwargs)
+      if position is None:
+        position = size
+      if not position in xrange(0, size + 1):
+        raise IndexError, _(u"invalid position")
+      new_position = cls._positional_base(new_kwargs) + position
+      if position < size:
+        cls._positional_shift(new_kwargs, new_position, None, 1)
     else:
-      self.insert_at(other._position + 1)
+      # Find the would-be neighbours in the new list:
+      others = manager.filter(**new_kwargs).values_list('_position', flat=True)
+      if position is None:
+        lower, upper = (list(others.reverse()[:1]) + [None])[0], None
+      else:
+        if position < 0:
+          raise IndexError, _(u"invalid position")
+        neighbours = list(others[max(position - 1, 0):position + 1])
+        if position and not neighbours:
+          raise IndexError, _(u"invalid position")
+        if position:
+          lower, upper = neighbours[0], (neighbours[1:] + [None])[0]
+        else:
+          lower, upper = None, (neighbours + [None])[0]
+      new_position = cls._positional_key_between(lower, upper)
+    values = self._positional_set_list(new_kwargs)
+    if new_position is None:
+      new_position = self._positional_rebalance(new_kwargs, lower, upper)
+    manager.filter(pk=self.pk).update(_position=new_position, **values)
+    self._position = new_position
+
+    # Close the gap left behind in the old list:
+    if cls._positional_dense:
+      cls._positional_shift(old_kwargs, old_position + 1, None, -1)
+    if self._positional_length is not None:
+      self._positional_length_save(False)
+    if self._positional_index is not None:
+      self._positional_index_save(False)
+
+  def _positional_set_list(self, kwargs):
+    """Sets the `order_with_respect_to` fields of the element to the values
+    in `kwargs`, which may be given as related objects or primary keys, and
+    returns them as keyword arguments for `QuerySet.update()`. Related
+    objects are passed to update() by primary key, so that the key is
+    prepared for the database by the related field."""
+    values = {}
+    for name, value in kwargs.iteritems():
+      field = self._meta.get_field(name)
+      if not isinstance(field, models.ForeignKey):
+        setattr(self, name, value)
+        values[name] = value
+        continue
+      if isinstance(value, models.Model):
+        setattr(self, name, value)
+      else:
+        setattr(self, field.attname, value)
+        if hasattr(self, field.get_cache_name()):
+          delattr(self, field.get_cache_name())
+      values[name] = getattr(value, 'pk', value)
+    return values
 
-  @transaction.commit_on_success
+  @_positional_operation
+  @_positional_mutation
   def swap(self, other):
     "Swaps the position with some other class instance"
-    # Save the current position:
-    current_position = self._position
-    # Set own position to special, temporary position:
-    self._position = -1
-    self.save()
-    # Exchange the two positions:
-    self._position, other._position = other._position, current_position
-    for obj in (other, self):
-      obj.save()
+    self._positional_lock(self._positional_list_kwargs())
+    if self._positional_keys == 'linked':
+      return self._positional_linked_swap(other.pk, other)
+    # Both positions are written by a single UPDATE, which matches each row
+    # against its original position, so there is no need to park either
+    # element anywhere in between:
+    for obj in (self, other):
+      obj._positional_load_saved()
+    manager = self.__class__._positional_order_manager
+    manager.filter(pk__in=[self.pk, other.pk]).update(_position=_PositionCase(
+      self.__class__, [(self.pk, other._position), (other.pk, self._position)]))
+    self._position, other._position = other._position, self._position
+    if self._positional_index is None or self.pk == other.pk:
+      return
+    # Bring the position index up to date, which only changes if the two
+    # elements belong to different lists:
+    deltas = {}
+    for obj in (self, other):
+      key, old = obj._positional_saved
+      for bucket, delta in ((self._positional_bucket(old), -1),
+                            (self._positional_bucket(obj._position), 1)):
+        deltas[key, bucket] = deltas.get((key, bucket), 0) + delta
+      obj._positional_saved = (key, obj._position)
+    for (key, bucket), delta in deltas.iteritems():
+      if delta:
+        self._positional_index_adjust(key, bucket, delta)
 
+  @_positional_operation
   def save(self, *args, **kwargs):
     """Saves the model to the database. It populates the `position` field of
     the model automatically if there is no such field set. In this case, the
-    element will be appended at the end of the list."""
+    element will be appended at the end of the list--or prepended at the
+    front, if the list grows at the front."""
+    # The element may be saved into another list, or at another position:
+    _forget_neighbours(self)
+    # The positions of elements ordered with respect to a ManyToManyField are
+    # kept by their entries in the intermediary model:
+    if self._positional_through is not None:
+      return super(PositionalOrderMixin, self).save(*args, **kwargs)
+    if self._positional_locking or self._positional_index is not None or \
+       self._positional_length is not None:
+      return self._positional_atomic_save(*args, **kwargs)
+    return self._positional_save(*args, **kwargs)
+
+  @_positional_mutation
+  def _positional_atomic_save(self, *args, **kwargs):
+    """Implements save() for models with position locking, a position index
+    or list lengths, which save an element in a transaction of its own: with
+    the list locked, and with the index and lengths brought up to date along
+    with it, or not at all."""
+    self._positional_lock(self._positional_list_kwargs())
+    return self._positional_save(*args, **kwargs)
+
+  def _positional_save(self, *args, **kwargs):
+    "Implements save(), with the list locked if need be."
+    if self._positional_keys == 'linked':
+      return self._positional_linked_save(*args, **kwargs)
     # Is there a position saved? (Explicitly testing None because 0 would be
     # False as well.)
     if self._position == None:
-      # No, it was empty. Find one:
+      # No, it was empty. Find one. A list growing at the front takes the
+      # position just before its first element:
+      if self._positional_growth == 'front':
+        try:
+          front = self.get_front(**self._positional_list_kwargs())
+          self._position = self._positional_key_between(None, front._position)
+        except self.DoesNotExist:
+          self._position = self._positional_key_between(None, None)
+      # Under dense numbering that is otherwise the length of the list, if it
+      # is being kept:
+      elif self._positional_dense and self._positional_length is not None:
+        self._position = self._positional_size(self._positional_list_kwargs())
+      else:
+        try:
+          # Set self's position to be the last element:
+          last = self.get_back(**self._positional_list_kwargs())
+          self._position = self._positional_key_between(last._position, None)
+        except self.DoesNotExist:
+          # IndexError happened: the query did not return any objects, so
+          # this has to be the first
+          self._position = self._positional_key_between(None, None)
+    # Save the now properly set-up model, making sure that the list and
+    # position it was saved with before are known first:
+    adding = self._state.adding
+    if not adding:
+      self._positional_load_saved()
+    result = super(PositionalOrderMixin, self).save(*args, **kwargs)
+    if self._positional_length is not None:
+      self._positional_length_save(adding)
+    if self._positional_index is not None:
+      self._positional_index_save(adding)
+    return result
+
+  def _positional_linked_save(self, *args, **kwargs):
+    """Implements save() for linked elements. A new element which has not
+    been linked to any other element is linked to the back of its list, or
+    to the front if the list grows at the front."""
+    if not self._state.adding or \
+       self._prev_id is not None or self._next_id is not None:
+      return super(PositionalOrderMixin, self).save(*args, **kwargs)
+    front = self._positional_growth == 'front'
+    manager = self.__class__._positional_order_manager
+    end = manager.filter(**self._positional_list_kwargs())
+    end = self._positional_linked_end(end, front and '_prev' or '_next')
+    end = (list(end.values_list('pk', flat=True)[:1]) + [None])[0]
+    if front:
+      self._next_id = end
+    else:
+      self._prev_id = end
+    result = super(PositionalOrderMixin, self).save(*args, **kwargs)
+    if end is not None:
+      manager.filter(pk=end).update(**{front and '_prev' or '_next': self.pk})
+    return result
+
+  @classmethod
+  @_positional_operation
+  @_positional_mutation
+  def bulk_append(cls, objs, batch_size=1000):
+    """Appends the unsaved instances `objs` to the back of their respective
+    lists, in the order given, inserting them with `bulk_create()`--or to the
+    front, if the lists grow at the front, so that each one ends up in front
+    of those given before it, as it would had it been saved. The end of each
+    list is looked up only once, and `objs` may be any iterable--a generator,
+    for example--which is consumed `batch_size` instances at a time. As with
+    `bulk_create()`, save() is not called and no signals are sent, so
+    auto-incremented primary keys are not set on the instances. Returns the
+    number of instances appended. Linked elements cannot be appended in bulk,
+    as they are linked to one another by primary key."""
+    if cls._positional_keys == 'linked':
+      raise NotImplementedError, _(u"bulk_append() does not support linked positions.")
+    if cls._positional_through is not None:
+      raise ValueError, _(u"bulk_append() does not support elements ordered with respect to a ManyToManyField.")
+    manager = cls._positional_order_manager
+    front = cls._positional_growth == 'front'
+    ends, deltas, lengths, batch, count = {}, {}, {}, [], 0
+    for obj in objs:
+      # Look up the end of the list the first time it is appended to, and
+      # keep track of it in memory afterwards:
+      kwargs = obj._positional_list_kwargs()
+      key = cls._positional_list_key(kwargs)
+      if key not in ends:
+        cls._positional_lock(kwargs)
+        end = manager.filter(**kwargs)
+        if not front:
+          end = end.reverse()
+        ends[key] = (list(end.values_list('_position', flat=True)[:1]) +
+                     [None])[0]
+      if front:
+        obj._position = ends[key] = \
+          cls._positional_key_between(None, ends[key])
+      else:
+        obj._position = ends[key] = \
+          cls._positional_key_between(ends[key], None)
+      if cls._positional_index is not None:
+        bucket = (key, cls._positional_bucket(obj._position))
+        deltas[bucket] = deltas.get(bucket, 0) + 1
+      if cls._positional_length is not None:
+        lengths[key] = lengths.get(key, 0) + 1
+      batch.append(obj)
+      if len(batch) >= batch_size:
+        manager.bulk_create(batch)
+        count, batch = count + len(batch), []
+    if batch:
+      manager.bulk_create(batch)
+      count += len(batch)
+    for (key, bucket), delta in deltas.iteritems():
+      cls._positional_index_adjust(key, bucket, delta)
+    for key, delta in lengths.iteritems():
+      cls._positional_length_adjust(key, delta)
+    return count
+
+  @classmethod
+  def get_order(cls, *args, **kwargs):
+    "Returns the primary keys of the elements of the list, in order."
+    # Combine args and kwargs based on `order_with_respect_to`:
+    kwargs = _match_args(cls._positional_order_with_respect_to, *args, **kwargs)
+    if cls._positional_through is not None:
+      return list(cls._positional_through_elements(kwargs)
+                     .values_list('pk', flat=True))
+    if cls._positional_keys == 'linked':
+      return cls._positional_linked_order(kwargs)
+    manager = cls._positional_order_manager
+    return list(manager.filter(**kwargs).values_list('pk', flat=True))
+
+  @classmethod
+  def get_list(cls, *args, **kwargs):
+    """Returns the elements of the list, in order. The elements of a linked
+    list are read by following their links with a single recursive query,
+    where the database supports one."""
+    # Combine args and kwargs based on `order_with_respect_to`:
+    kwargs = _match_args(cls._positional_order_with_respect_to, *args, **kwargs)
+    if cls._positional_through is not None:
+      return list(cls._positional_through_elements(kwargs))
+    if cls._positional_keys == 'linked':
+      return cls._positional_linked_elements(kwargs)
+    return list(cls._positional_order_manager.filter(**kwargs))
+
+  @classmethod
+  @_positional_operation
+  @_positional_mutation
+  def set_order(cls, id_list, *args, **kwargs):
+    """Reorders the list to match `id_list`, the primary keys of all of its
+    elements in their new order. Every position is rewritten by a single
+    UPDATE statement, or by a few if the database limits the size of a
+    statement. Raises ValueError unless `id_list` holds each element of the
+    list exactly once."""
+    # Combine args and kwargs based on `order_with_respect_to`:
+    kwargs = _match_args(cls._positional_order_with_respect_to, *args, **kwargs)
+    if cls._positional_through is not None:
+      # Reorder the entries of the elements instead:
+      entries = dict(cls._positional_through_entries(kwargs).values_list(
+        cls._positional_through_source, 'pk'))
       try:
-        # Set self's position to be the last element:
-        last = self.get_back(**self.get_positional_list_kwargs())
-        self._position = last._position + 1
-      except self.DoesNotExist:
-        # IndexError happened: the query did not return any objects, so this
-        # has to be the first
-        self._position = 0
-    # Save the now properly set-up model:
-    return super(PositionalOrderMixin, self).save(*args, **kwargs)
+        id_list = [entries.pop(pk) for pk in id_list]
+      except KeyError:
+        raise ValueError, _(u"set_order() requires each element of the list exactly once.")
+      entry = cls._positional_through._positional_order_with_respect_to[0]
+      return cls._positional_through.set_order(id_list,
+        **{entry: kwargs[cls._positional_order_with_respect_to[0]]})
+    cls._positional_lock(kwargs)
+    qs = cls._positional_order_manager.filter(**kwargs)
+    id_list = list(id_list)
+    if len(set(id_list)) != len(id_list) or \
+       set(qs.values_list('pk', flat=True)) != set(id_list):
+      raise ValueError, _(u"set_order() requires each element of the list exactly once.")
+    cls._positional_renumber(kwargs, id_list)
 
+  @classmethod
+  def _positional_renumber(cls, kwargs, id_list):
+    """Renumbers the list identified by `kwargs` from scratch, just as it
+    would have been had the elements whose primary keys are `id_list` been
+    appended in this order."""
+    qs = cls._positional_order_manager.filter(**kwargs)
+    # Linked elements only need the links which change to be written:
+    if cls._positional_keys == 'linked':
+      old_links = dict((row[0], row[1:])
+                       for row in qs.values_list('pk', '_prev', '_next'))
+      prevs, nexts = {}, {}
+      for pk, (prev, next) in _chain_links(id_list).iteritems():
+        if prev != old_links[pk][0]:
+          prevs[pk] = prev
+        if next != old_links[pk][1]:
+          nexts[pk] = next
+      return cls._positional_relink(prevs, nexts)
+    positions = zip(id_list,
+      cls._positional_keys_between(None, None, len(id_list)))
+    batch_size = _position_case_batch_size(connections[qs.db]) or \
+                 max(len(positions), 1)
+    for start in xrange(0, len(positions), batch_size):
+      batch = positions[start:start+batch_size]
+      qs.filter(pk__in=[pk for pk, position in batch]) \
+        .update(_position=_PositionCase(cls, batch))
+
+    # Recount the list in the position index, if there is one:
+    if cls._positional_index is not None:
+      key = cls._positional_list_key(kwargs)
+      counts = {}
+      for pk, position in positions:
+        bucket = cls._positional_bucket(position)
+        counts[bucket] = counts.get(bucket, 0) + 1
+      index = cls._positional_index
+      index.objects.filter(list_key=key).delete()
+      index.objects.bulk_create([
+        index(list_key=key, bucket=bucket, count=count)
+        for bucket, count in counts.iteritems()])
+
+  @classmethod
+  def check_positions(cls, batch_size=1000):
+    """Scans every list of the model for broken positions: duplicates, and
+    under dense numbering gaps and negative positions as well (though the
+    positions of a list growing at the front may be negative). Yields the
+    filter keyword arguments identifying each broken list, along with a
+    dictionary counting its `gaps`, `duplicates` and `negatives`. The lists
+    are looked up `batch_size` at a time, and the positions of each list
+    read `batch_size` at a time after the last position (and primary key)
+    read, so that memory use is bounded however many lists there are and
+    however long they are. Lists ordered with respect to many-to-many
+    relations are not supported, nor are linked lists."""
+    if cls._positional_keys == 'linked':
+      raise NotImplementedError, _(u"check_positions() does not support linked positions.")
+    manager = cls._positional_order_manager
+    owrt = list(cls._positional_order_with_respect_to)
+    def _positions(kwargs):
+      rows = manager.filter(**kwargs).order_by('_position', 'pk') \
+                    .values_list('_position', 'pk')
+      batch = list(rows[:batch_size])
+      while batch:
+        for position, pk in batch:
+          yield position
+        if len(batch) < batch_size:
+          return
+        position, pk = batch[-1]
+        batch = list(rows.filter(models.Q(_position__gt=position) |
+                                 models.Q(_position=position, pk__gt=pk))
+                         [:batch_size])
+    def _lists():
+      if not owrt:
+        yield {}
+        return
+      keys = manager.order_by(*owrt).values_list(*owrt).distinct()
+      offset = 0
+      while True:
+        batch = list(keys[offset:offset + batch_size])
+        for key in batch:
+          yield dict(zip(owrt, key))
+        if len(batch) < batch_size:
+          return
+        offset += batch_size
+    for kwargs in _lists():
+      problems = {'gaps': 0, 'duplicates': 0, 'negatives': 0}
+      previous = None
+      for position in _positions(kwargs):
+        if previous is not None and position == previous:
+          problems['duplicates'] += 1
+        elif cls._positional_dense:
+          # A list growing at the front may start anywhere:
+          if cls._positional_growth == 'front':
+            if previous is not None and position > previous + 1:
+              problems['gaps'] += 1
+          elif position < 0:
+            problems['negatives'] += 1
+          elif position > (previous is None and -1 or previous) + 1:
+            problems['gaps'] += 1
+        previous = position
+      if any(problems.itervalues()):
+        yield kwargs, problems
+
+  @classmethod
+  @_positional_operation
+  @_positional_mutation
+  def repair_positions(cls, *args, **kwargs):
+    """Renumbers the list from scratch, keeping its elements in the order of
+    their positions--and of their primary keys, where positions are
+    duplicated. This repairs the lists reported by `check_positions()`."""
+    if cls._positional_keys == 'linked':
+      raise NotImplementedError, _(u"repair_positions() does not support linked positions.")
+    # Combine args and kwargs based on `order_with_respect_to`:
+    kwargs = _match_args(cls._positional_order_with_respect_to, *args, **kwargs)
+    cls._positional_lock(kwargs)
+    id_list = list(cls._positional_order_manager.filter(**kwargs)
+                      .order_by('_position', 'pk').values_list('pk', flat=True))
+    cls._positional_renumber(kwargs, id_list)
+    # The length of the list may have gone astray as well:
+    if cls._positional_length is not None:
+      key = cls._positional_list_key(kwargs)
+      length = cls._positional_length
+      if not length.objects.filter(list_key=key).update(length=len(id_list)):
+        length.objects.create(list_key=key, length=len(id_list))
+
+  @classmethod
+  @_positional_operation
+  def normalize_positions(cls, batch_size=100):
+    """Moves every list of a model growing at the front under dense numbering
+    back to start at position 0, with one UPDATE statement per list. The
+    lists to move are found with a single query, and are then moved
+    `batch_size` lists to a transaction, each list locked in turn. Returns the
+    number of lists moved."""
+    if cls._positional_growth != 'front' or not cls._positional_dense:
+      return 0
+    owrt = cls._positional_order_with_respect_to
+    qs = cls._positional_order_manager.order_by()
+    if owrt:
+      rows = qs.values_list(*owrt).annotate(models.Min('_position'))
+    else:
+      rows = [(qs.aggregate(models.Min('_position')).values()[0],)]
+    keys = [row[:-1] for row in rows if row[-1]]
+    for start in xrange(0, len(keys), batch_size):
+      with transaction.commit_on_success():
+        for key in keys[start:start+batch_size]:
+          kwargs = dict(zip(owrt, key))
+          cls._positional_lock(kwargs)
+          # The front may have moved on since it was read:
+          base = cls._positional_base(kwargs)
+          if base:
+            cls._positional_shift(kwargs, base, None, -base)
+    return len(keys)
+
+  @_positional_operation
+  @_positional_mutation
   def delete(self, *args, **kwargs):
     "Deletes the item from the list."
-    manager = self.__class__._positional_order_manager
-    # get all objects with a position greater than this objects position
-    objects_after = manager.filter(_position__gt=self._position,
-      **self.get_positional_list_kwargs())
+    # Remove the entries of an element ordered with respect to a
+    # ManyToManyField from each of its lists first, so that the gaps they
+    # leave behind are closed:
+    if self._positional_through is not None:
+      self._positional_through._positional_order_manager.filter(**{
+        self._positional_through_source: self,
+      }).delete()
+      return super(PositionalOrderMixin, self).delete(*args, **kwargs)
+    # Note which list we are being removed from before the deletion happens:
+    list_kwargs = self._positional_list_kwargs()
+    self._positional_lock(list_kwargs)
+    # A linked element is taken out of the list by linking its neighbours to
+    # one another:
+    if self._positional_keys == 'linked':
+      prev, next = self._positional_links(self.pk)[self.pk]
+      prevs, nexts = {}, {}
+      if next is not None:
+        prevs[next] = prev
+      if prev is not None:
+        nexts[prev] = next
+      self._positional_relink(prevs, nexts)
+      return super(PositionalOrderMixin, self).delete(*args, **kwargs)
     # now we remove this model instance
     # so the `position` is free and other instances can fill this gap
+    # (reading it first, as it cannot be loaded afterwards if it was
+    # deferred)
+    position = self._position
     super(PositionalOrderMixin, self).delete(*args, **kwargs)
 
-    # iterate through all objects which were found
-    for element in objects_after:
-      # decrease the position in the list (means: move forward)
-      element._position -= 1
-      element.save()
+    # Move every element which followed this one forward by one position.
+    # Sparse positions are left with the gap.
+    if self._positional_dense:
+      self._positional_shift(list_kwargs, position + 1, None, -1)
 
   ##################################
   ## Pythonic Instance Attributes ##
@@ -379,7 +2937,60 @@ class PositionalOrderMixin(models.Model):
     super(PositionalOrderMixin, self).__init__(*args, **kwargs)
 
     # Pythonic instance attributes go here:
-    pass
+
+    # The list and position this element was last saved with, as far as the
+    # position index and the list lengths are concerned. If any of them was
+    # deferred they are read from the database when first needed instead, as
+    # reading them here would issue a query for each element loaded:
+    if self._positional_index is not None or \
+       self._positional_length is not None:
+      loaded = self.__dict__
+      if '_position' in loaded and all(field is None or
+                                       field.attname in loaded
+                                       for field in
+                                       self._positional_list_fields):
+        self._positional_saved = (self._positional_index_key(),
+                                  self._position)
+
+  def _get_positional_saved(self):
+    """Returns the list and position this element was last saved with, which
+    are read from the database if they were not loaded with the element. An
+    element which is not (or no longer) in the database is taken to have been
+    saved with its current list and position."""
+    try:
+      return self.__dict__['_positional_saved']
+    except KeyError:
+      pass
+    fields = self._positional_list_fields
+    saved = None
+    if self.pk is not None:
+      rows = self.__class__._positional_order_manager.filter(pk=self.pk) \
+               .values_list(*[field.name for field in fields
+                              if field is not None] + ['_position'])[:1]
+      for row in rows:
+        row, values = list(row), []
+        for field, attname in zip(fields, self._positional_list_attnames):
+          values.append(getattr(self, attname) if field is None
+                        else row.pop(0))
+        saved = (_position_index_key(values), row[0])
+    if saved is None:
+      saved = (self._positional_index_key(), self._position)
+    self.__dict__['_positional_saved'] = saved
+    return saved
+
+  def _positional_load_saved(self):
+    """Makes sure that the list and position this element was last saved
+    with are known, if the position index or the list lengths need them. This
+    must be done before the element is written, or they would be read back
+    from the row as it was just written."""
+    if self._positional_index is not None or \
+       self._positional_length is not None:
+      self._positional_saved
+
+  def _set_positional_saved(self, saved):
+    self.__dict__['_positional_saved'] = saved
+
+  _positional_saved = property(_get_positional_saved, _set_positional_saved)
 
   ###############
   # Meta Fields #
@@ -388,6 +2999,198 @@ class PositionalOrderMixin(models.Model):
   class Meta:
     abstract = True
 
+class PositionalPage(object):
+  """A page of a positional list, as returned by `PositionalPaginator.page()`.
+  Rather than page numbers, the neighbouring pages are identified by the
+  opaque cursor tokens `next_cursor` and `previous_cursor`, which are None
+  if there is no such page."""
+  def __init__(self, object_list, next_cursor, previous_cursor):
+    self.object_list = object_list
+    self.next_cursor = next_cursor
+    self.previous_cursor = previous_cursor
+
+  def __repr__(self):
+    return '<PositionalPage of %d elements>' % len(self.object_list)
+
+  def __len__(self):
+    return len(self.object_list)
+
+  def __iter__(self):
+    return iter(self.object_list)
+
+  def __getitem__(self, idx):
+    return self.object_list[idx]
+
+  def has_next(self):
+    return self.next_cursor is not None
+
+  def has_previous(self):
+    return self.previous_cursor is not None
+
+class PositionalPaginator(object):
+  """Pages through a single list of a model using PositionalOrderMixin by the
+  positions of its elements, rather than by offset:
+
+    paginator = PositionalPaginator(MyOrderedModel, 25, other=obj)
+    page = paginator.page()
+    ...
+    page = paginator.page(page.next_cursor)
+
+  Each page is read with a single query which asks for the elements after
+  (or before) the last position seen, so that a page deep into the list costs
+  the same as the first page. The list is selected with the same arguments
+  as `get_front()`. Cursor tokens are opaque, URL-safe strings; should an
+  element be moved or deleted in between the retrieval of two pages, the
+  later page simply follows on from the position that element used to have.
+  The positions of a model ordered with respect to a ManyToManyField are kept
+  by its intermediary model, whose entries are paged through instead.
+  """
+  def __init__(self, model, per_page, *args, **kwargs):
+    if per_page < 1:
+      raise ValueError, _(u"per_page must be a positive integer.")
+    if model._positional_keys == 'linked':
+      raise ValueError, _(u"linked lists cannot be paged through by position.")
+    if model._positional_through is not None:
+      raise ValueError, _(u"elements ordered with respect to a ManyToManyField cannot be paged through by position; page through the entries of its intermediary model instead.")
+    self.model = model
+    self.per_page = per_page
+    # Combine args and kwargs based on `order_with_respect_to`:
+    self.list_kwargs = _match_args(model._positional_order_with_respect_to,
+                                   *args, **kwargs)
+
+  def _encode(self, direction, position):
+    "Returns the cursor token of the page `direction` of `position`."
+    return base64.urlsafe_b64encode(json.dumps([direction, position]))
+
+  def _decode(self, cursor):
+    """Returns the direction and position encoded in the cursor token
+    `cursor`, raising InvalidPage if it is not a valid cursor token. The
+    position must be one the model's `_position` field can hold, so that a
+    tampered cursor is refused here rather than by the query it would make."""
+    field = self.model._meta.get_field('_position')
+    try:
+      direction, position = json.loads(base64.urlsafe_b64decode(str(cursor)))
+      if direction not in ('next', 'previous') or \
+         not isinstance(position, (int, long, basestring)):
+        raise ValueError
+      position = field.to_python(position)
+    except (TypeError, ValueError, UnicodeError, ValidationError):
+      raise InvalidPage(_(u"invalid cursor"))
+    return direction, position
+
+  def page(self, cursor=None):
+    """Returns the page identified by `cursor`, a token previously returned as
+    the `next_cursor` or `previous_cursor` of a page, or the first page of the
+    list if no cursor is given."""
+    qs = self.model._positional_order_manager.filter(**self.list_kwargs) \
+                                             .order_by('_position')
+    direction, position = 'next', None
+    if cursor is not None:
+      direction, position = self._decode(cursor)
+    if direction == 'next':
+      if position is not None:
+        qs = qs.filter(_position__gt=position)
+    else:
+      qs = qs.filter(_position__lt=position).reverse()
+
+    # One element more than fits on the page tells whether there is another
+    # page beyond it:
+    object_list = list(qs[:self.per_page+1])
+    more = len(object_list) > self.per_page
+    object_list = object_list[:self.per_page]
+    if direction == 'previous':
+      object_list.reverse()
+    if not object_list:
+      return PositionalPage(object_list, None, None)
+    first, last = object_list[0]._position, object_list[-1]._position
+    if direction == 'next':
+      return PositionalPage(object_list,
+        more and self._encode('next', last) or None,
+        position is not None and self._encode('previous', first) or None)
+    return PositionalPage(object_list,
+      self._encode('next', last),
+      more and self._encode('previous', first) or None)
+
+def _position_key_field(model):
+  """Returns the name of the field of `model` which orders the elements of a
+  list."""
+  if model._positional_keys == 'linked':
+    return '_prev'
+  return '_position'
+
+def _position_composite_index_sql(model, connection):
+  """Returns the name of the composite index over the `order_with_respect_to`
+  columns and `_position` of `model` (or `_prev`, for linked elements, which
+  serves looking up the front of a list), and the SQL statements which create
+  it on `connection`. Fields which are not columns of the model's table (such
+  as reverse relations) are left out."""
+  qn = connection.ops.quote_name
+  columns = []
+  for name in model._positional_order_with_respect_to:
+    try:
+      field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+      continue
+    if field.column and field in model._meta.local_fields:
+      columns.append(field.column)
+  columns.append(model._meta.get_field(_position_key_field(model)).column)
+  table = model._meta.db_table
+  name = truncate_name('%s_position' % table,
+                       connection.ops.max_name_length())
+  columns = ', '.join(map(qn, columns))
+  if model._positional_unique and connection.vendor == 'postgresql' and \
+     model._positional_keys != 'linked':
+    return name, ['ALTER TABLE %s ADD CONSTRAINT %s UNIQUE (%s) '
+                  'DEFERRABLE INITIALLY DEFERRED' % (qn(table), qn(name), columns)]
+  return name, ['CREATE INDEX %s ON %s (%s)' % (qn(name), qn(table), columns)]
+
+def _position_composite_index_exists(connection, table, name):
+  "Returns whether the index `name` of the table `table` exists."
+  cursor = connection.cursor()
+  if connection.vendor == 'sqlite':
+    cursor.execute("SELECT 1 FROM sqlite_master "
+                   "WHERE type = 'index' AND tbl_name = %s AND name = %s",
+                   [table, name])
+  elif connection.vendor == 'postgresql':
+    cursor.execute("SELECT 1 FROM pg_indexes "
+                   "WHERE tablename = %s AND indexname = %s", [table, name])
+  elif connection.vendor == 'mysql':
+    cursor.execute("SELECT 1 FROM information_schema.statistics "
+                   "WHERE table_schema = DATABASE() "
+                   "AND table_name = %s AND index_name = %s", [table, name])
+  elif connection.vendor == 'oracle':
+    cursor.execute("SELECT 1 FROM user_indexes "
+                   "WHERE table_name = UPPER(%s) AND index_name = UPPER(%s)",
+                   [table, name])
+  else:
+    return False
+  return cursor.fetchone() is not None
+
+def _create_position_composite_indexes(sender, created_models, db, **kwargs):
+  """Creates the composite index of each positional model of the application
+  `sender` which syncdb has just created. Django 1.4 cannot declare an index
+  over more than one column, which is why this is done here. As flush sends
+  the post_syncdb signal for models which already exist, an index is only
+  created if it does not exist yet."""
+  connection = connections[db]
+  for model in created_models:
+    if not issubclass(model, PositionalOrderMixin) or \
+       model._meta.abstract or model._meta.proxy or \
+       model._positional_through is not None or \
+       not model._meta.managed or \
+       model._meta.get_field(_position_key_field(model)) not in \
+         model._meta.local_fields or \
+       model._meta.app_label != sender.__name__.split('.')[-2]:
+      continue
+    name, statements = _position_composite_index_sql(model, connection)
+    if _position_composite_index_exists(connection, model._meta.db_table, name):
+      continue
+    cursor = connection.cursor()
+    for statement in statements:
+      cursor.execute(statement)
+  transaction.commit_unless_managed(using=db)
+models.signals.post_syncdb.connect(_create_position_composite_indexes)
+
 # ===----------------------------------------------------------------------===
 # End of File
 # ===----------------------------------------------------------------------===
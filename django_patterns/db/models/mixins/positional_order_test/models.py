@@ -35,7 +35,7 @@
 
 # Django-core, object-relational mapper
 from django.db.models import Model, CharField, DateTimeField, ForeignKey, \
-  IntegerField, ManyToManyField, OneToOneField
+  IntegerField, Manager, ManyToManyField, OneToOneField, TextField
 
 # Django.core, translation
 from django.utils.translation import ugettext_lazy as _
@@ -80,6 +80,17 @@ class ForeignKeyPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
   class Meta(object):
     order_with_respect_to = ('other',)
 
+class WideForeignKeyPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using positional order with respect to a ForeignKey field,
+  whose rows are made wide by a payload the list operations have no business
+  reading or writing."""
+  other = ForeignKey(RelatedKeyModel)
+  title = CharField(max_length=255, default=u"title " * 40)
+  summary = CharField(max_length=255, default=u"summary " * 30)
+  body = TextField(default=u"body " * 2048)
+  class Meta(object):
+    order_with_respect_to = ('other',)
+
 class SelfReferentialPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
   "Test a model using positional order with respect to itself."
   parent = ForeignKey('self', related_name='children', null=True)
@@ -95,10 +106,20 @@ class DjangoCompatiblePositionalOrderModel(PositionalOrderMixin, UUIDStampedMixi
 
 class ManyToManyPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
   """Tests a model using positional order with respect to a
-  ManyToManyField."""
+  ManyToManyField, whose positions are kept by the intermediary model."""
   other = ManyToManyField(RelatedKeyModel)
   class Meta(object):
     order_with_respect_to = ('other',)
+    position_through = True
+
+class SelfManyToManyPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using positional order with respect to a ManyToManyField
+  relating it to itself, whose positions are kept by the intermediary
+  model."""
+  other = ManyToManyField('self')
+  class Meta(object):
+    order_with_respect_to = ('other',)
+    position_through = True
 
 class ReverseManyToManyPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
   """Tests a model using positional order with respect to a related field.
@@ -117,6 +138,15 @@ class ReverseRelatedModel(Model):
 # with respect to an IntegerField (a stand-in for all of the remaining field
 # types), before moving on to testing various scenarios (including ordering
 # with respect to multiple fields).
+class BackwardsManager(Manager):
+  """A custom manager, which the positional-order mixin must leave in place."""
+  def backwards(self):
+    return self.get_query_set().order_by('-_position')
+class CustomManagerPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using positional order which declares its own `objects`
+  manager."""
+  objects = BackwardsManager()
+
 class IntegerPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
   """Tests a model using positional order with respect to just an
   IntegerField."""
@@ -124,6 +154,106 @@ class IntegerPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
   class Meta(object):
     order_with_respect_to = ('playlist',)
 
+# Sparse position numbering is tested with the simplest model possible, a
+# single list whose elements are spaced 2**16 apart, then with respect to a
+# ForeignKey, and finally with a spacing so tight that nearly every move
+# exhausts a gap and forces the list to be renumbered.
+class SparsePositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  "Tests a model using sparse position numbering."
+  class Meta(object):
+    position_spacing = 2**16
+
+class SparseForeignKeyPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using sparse position numbering with respect to a
+  ForeignKey field."""
+  other = ForeignKey(RelatedKeyModel)
+  class Meta(object):
+    order_with_respect_to = ('other',)
+    position_spacing = 2**16
+
+class TightlySpacedPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using sparse position numbering with the smallest spacing
+  possible, so that gaps are exhausted almost immediately."""
+  class Meta(object):
+    position_spacing = 2
+
+class LexicographicPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  "Tests a model using lexicographic positions."
+  class Meta(object):
+    position_keys = 'lexicographic'
+
+class LexicographicForeignKeyPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using lexicographic positions with respect to a ForeignKey
+  field."""
+  other = ForeignKey(RelatedKeyModel)
+  class Meta(object):
+    order_with_respect_to = ('other',)
+    position_keys = 'lexicographic'
+
+class IndexedSparsePositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using sparse position numbering with respect to a
+  ForeignKey field, with a position index."""
+  other = ForeignKey(RelatedKeyModel)
+  class Meta(object):
+    order_with_respect_to = ('other',)
+    position_spacing = 2**16
+    position_index = True
+
+class IndexedLexicographicPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  "Tests a model using lexicographic positions with a position index."
+  class Meta(object):
+    position_keys = 'lexicographic'
+    position_index = True
+
+class CountedPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using positional order with respect to a ForeignKey field,
+  with the length of each list kept."""
+  other = ForeignKey(RelatedKeyModel)
+  class Meta(object):
+    order_with_respect_to = ('other',)
+    position_length = True
+
+class CountedSparsePositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using sparse position numbering, with the length of each
+  list kept."""
+  class Meta(object):
+    position_spacing = 2**16
+    position_length = True
+
+class PrependingPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using positional order with respect to a ForeignKey field,
+  with new elements placed at the front of their list."""
+  other = ForeignKey(RelatedKeyModel)
+  class Meta(object):
+    order_with_respect_to = ('other',)
+    position_growth = 'front'
+
+class LinkedPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using positional order with respect to a ForeignKey field,
+  with each element linked to its neighbours instead of numbered."""
+  other = ForeignKey(RelatedKeyModel)
+  class Meta(object):
+    order_with_respect_to = ('other',)
+    position_keys = 'linked'
+
+class LockingPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using positional order with respect to a ForeignKey field,
+  with concurrent modifications of a list serialized."""
+  other = ForeignKey(RelatedKeyModel)
+  class Meta(object):
+    order_with_respect_to = ('other',)
+    position_locking = True
+
+class CountedLockingPositionalOrderModel(PositionalOrderMixin, UUIDStampedMixin):
+  """Tests a model using positional order with respect to a ForeignKey field,
+  with concurrent modifications of a list serialized and the length of each
+  list kept."""
+  other = ForeignKey(RelatedKeyModel)
+  class Meta(object):
+    order_with_respect_to = ('other',)
+    position_locking = True
+    position_length = True
+
 class Poll(Model):
   question = CharField(help_text=_(u"poll question"), max_length=200)
   pub_date = DateTimeField(help_text=_(u"date published"))
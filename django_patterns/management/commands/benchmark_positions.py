@@ -0,0 +1,486 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# === django_patterns.management.commands.benchmark_positions -------------===
+# Copyright © 2011-2012, RokuSigma Inc. and contributors. See AUTHORS for more
+# details.
+#
+# Some rights reserved.
+#
+# Redistribution and use in source and binary forms of the software as well as
+# documentation, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+#  * Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#  * The names of the copyright holders or contributors may not be used to
+#    endorse or promote products derived from this software without specific
+#    prior written permission.
+#
+# THIS SOFTWARE AND DOCUMENTATION IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS “AS IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+# OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE AND
+# DOCUMENTATION, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ===----------------------------------------------------------------------===
+
+"""
+Benchmarks the operations of models using PositionalOrderMixin on lists of
+growing size: appending an element, inserting one at the front, middle and
+back, deleting one, swapping two, moving one to the back and reading the whole
+list. Each operation is timed --repeat times at each of the --sizes given, and
+the median is reported along with the number of statements issued and rows
+touched, as JSON written to --output (or standard output). Models are named as
+app_label.ModelName; if only an app_label is given then each of its models is
+benchmarked, and if nothing is given then every installed model is. The time
+taken to build --classes model classes using PositionalOrderMixin, in a
+variety of configurations, is reported as well, as it adds to the startup
+time of a project with many positional models. So is the effect of the width
+of rows: a model whose rows carry a payload of each of --widths bytes besides
+their position is benchmarked at those of the --sizes up to 10000.
+
+The benchmark runs in a newly created test database, which is in memory for
+SQLite unless --database-file names a file for it (which is deleted
+afterwards). With --baseline the results are compared with those of an
+earlier run, and the command fails if any operation became slower by more
+than --tolerance, or issues more statements than it did.
+"""
+
+# Python standard library, JSON encoding
+import json
+
+# Python standard library, command-line options
+from optparse import make_option
+
+# Python standard library, iteration
+from itertools import count
+
+# Python standard library, timing
+import time
+
+# Django-core, management commands
+from django.core.management.base import BaseCommand, CommandError
+
+# Django-core, management styles
+from django.core.management.color import no_style
+
+# Django-core, object-relational mapper
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.utils import DatabaseError
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.loading import cache as app_cache
+
+# Django-patterns, positional order mixin
+from django_patterns.db.models.mixins import (PositionalOrderMixin,
+  positional_operation)
+
+_SIZES = '10,100,1000,10000,100000,1000000'
+_WIDTHS = '0,4096'
+_WIDTH_SIZE_LIMIT = 10000
+
+# The Meta options of the model classes built by the class construction
+# benchmark, in turn. The classes are registered with an application which is
+# not installed, so that they are not picked up as models of the project.
+_CLASS_OPTIONS = (
+  {},
+  {'position_spacing': 1024},
+  {'position_keys': 'lexicographic'},
+  {'position_keys': 'linked'},
+  {'position_growth': 'front', 'position_locking': True},
+)
+_CLASS_APP_LABEL = '_benchmark_positions'
+_class_names = count()
+
+def _build_classes(number):
+  """Builds `number` model classes using PositionalOrderMixin, ordered with
+  respect to a ForeignKey, each under a name of its own."""
+  class Meta:
+    app_label = _CLASS_APP_LABEL
+  related = type('Related%d' % _class_names.next(), (models.Model,), {
+    '__module__': __name__, 'Meta': Meta})
+  for i in xrange(0, number):
+    meta = dict(_CLASS_OPTIONS[i % len(_CLASS_OPTIONS)],
+                app_label=_CLASS_APP_LABEL, order_with_respect_to=('other',))
+    type('Positional%d' % _class_names.next(), (PositionalOrderMixin,), {
+      '__module__': __name__,
+      'Meta': type('Meta', (object,), meta),
+      'other': models.ForeignKey(related, related_name='+'),
+    })
+
+def _build_width_models(width):
+  """Builds a model class using PositionalOrderMixin, ordered with respect to
+  a ForeignKey, whose rows carry a payload of `width` bytes, returning it
+  along with the related model class. Both are named after `width`, so that
+  their results can be compared between runs."""
+  class Meta:
+    app_label = _CLASS_APP_LABEL
+  related = type('WidthRelated%d' % width, (models.Model,), {
+    '__module__': __name__, 'Meta': Meta})
+  model = type('Width%d' % width, (PositionalOrderMixin,), {
+    '__module__': __name__,
+    'Meta': type('Meta', (object,), {'app_label': _CLASS_APP_LABEL,
+                                     'order_with_respect_to': ('other',)}),
+    'other': models.ForeignKey(related, related_name='+'),
+    'payload': models.TextField(default='x' * width),
+  })
+  return related, model
+
+def _create_tables(connection, *classes):
+  "Creates the tables of the model `classes`, in order."
+  style, known = no_style(), set()
+  cursor = connection.cursor()
+  for model in classes:
+    statements, pending = connection.creation.sql_create_model(model, style,
+                                                               known)
+    known.add(model)
+    statements.extend(connection.creation.sql_indexes_for_model(model, style))
+    for statement in statements:
+      cursor.execute(statement)
+  transaction.commit_unless_managed()
+
+def _drop_tables(connection, *classes):
+  "Drops the tables of the model `classes`, in reverse order."
+  cursor = connection.cursor()
+  for model in reversed(classes):
+    cursor.execute('DROP TABLE %s' %
+                   connection.ops.quote_name(model._meta.db_table))
+  transaction.commit_unless_managed()
+
+def _supported(model):
+  """Returns whether lists of `model` can be set up by the benchmark, which is
+  the case if they are ordered with respect to nothing but ForeignKeys (whose
+  related objects are created without arguments), and its elements need no
+  other related object. Lists ordered with respect to a OneToOneField hold a
+  single element."""
+  if model._meta.abstract or model._meta.proxy or \
+     model._positional_through is not None:
+    return False
+  owrt = model._positional_order_with_respect_to
+  for name in owrt:
+    try:
+      field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+      return False
+    if not isinstance(field, models.ForeignKey) or \
+       isinstance(field, models.OneToOneField):
+      return False
+  for field in model._meta.fields:
+    if isinstance(field, models.ForeignKey) and field.name not in owrt and \
+       not field.null and not field.has_default():
+      return False
+  return True
+
+
+def _grow(model, kwargs, count):
+  "Appends `count` new elements to the list identified by `kwargs`."
+  if model._positional_keys == 'linked':
+    for i in xrange(0, count):
+      model(**kwargs).save()
+  else:
+    model.bulk_append(model(**kwargs) for i in xrange(0, count))
+
+def _create_list(model, size):
+  """Creates a new list of `model` of `size` elements, returning the keyword
+  arguments which identify it, or None if its related objects or elements
+  cannot be created without arguments."""
+  kwargs = {}
+  try:
+    for name in model._positional_order_with_respect_to:
+      related = model._meta.get_field(name).rel.to()
+      related.save()
+      kwargs[name] = related
+    _grow(model, kwargs, size)
+    # Make sure that appending another element succeeds as well, as it
+    # would not if the elements had a unique field left empty:
+    model(**kwargs).save()
+    model.get_back(**kwargs).delete()
+  except DatabaseError:
+    transaction.rollback_unless_managed()
+    for related in kwargs.values():
+      related.delete()
+    return None
+  return kwargs
+
+def _operations(model, kwargs, size):
+  """Returns the operations benchmarked on the list identified by `kwargs`
+  of `size` elements, as (name, prepare, perform, restore) tuples. Only
+  `perform` is timed: it is passed what `prepare` returns, as is `restore`,
+  which puts the list back to its original size if need be."""
+  front = lambda: model.get_front(**kwargs)
+  back = lambda: model.get_back(**kwargs)
+  new = lambda: model(**kwargs)
+  return (
+    ('append', new, lambda obj: obj.save(), lambda obj: obj.delete()),
+    ('insert_at_front', back, lambda obj: obj.insert_at(0), None),
+    ('insert_at_middle', back, lambda obj: obj.insert_at(size // 2), None),
+    ('insert_at_back', front, lambda obj: obj.insert_at(size - 1), None),
+    ('delete', front, lambda obj: obj.delete(), lambda obj: new().save()),
+    ('swap', lambda: (front(), back()),
+             lambda objs: objs[0].swap(objs[1]), None),
+    ('move_to_back', front, lambda obj: obj.move_to_back(), None),
+    ('read', lambda: None, lambda x: model.get_list(**kwargs), None),
+  )
+
+def compare(baseline, results, tolerance):
+  """Returns a description of each regression of the benchmark `results`
+  against those of `baseline`: an operation whose median time grew by more
+  than the fraction `tolerance`, or which issues more statements. Operations
+  missing from either run are not compared."""
+  old = dict(((x['model'], x['size'], x['operation']), x)
+             for x in baseline['results'])
+  regressions = []
+  for new in results['results']:
+    key = (new['model'], new['size'], new['operation'])
+    if key not in old:
+      continue
+    name = "%s.%s at %d" % (new['model'], new['operation'], new['size'])
+    if new['seconds'] > old[key]['seconds'] * (1 + tolerance):
+      regressions.append("%s: %.6fs, up from %.6fs" %
+        (name, new['seconds'], old[key]['seconds']))
+    if new['queries'] is not None and old[key]['queries'] is not None and \
+       new['queries'] > old[key]['queries']:
+      regressions.append("%s: %d queries, up from %d" %
+        (name, new['queries'], old[key]['queries']))
+  return regressions
+
+class Command(BaseCommand):
+  args = '[app_label[.ModelName] ...]'
+  help = __doc__.strip()
+  option_list = BaseCommand.option_list + (
+    make_option('--sizes', action='store', dest='sizes', default=_SIZES,
+      help="Comma-separated list sizes to benchmark at, in increasing "
+           "order (default %s)." % _SIZES),
+    make_option('--repeat', action='store', type='int', dest='repeat',
+      default=5, help="Number of times each operation is timed at each "
+                      "size."),
+    make_option('--classes', action='store', type='int', dest='classes',
+      default=100, help="Number of model classes to time the construction "
+                        "of (0 to skip)."),
+    make_option('--widths', action='store', dest='widths', default=_WIDTHS,
+      help="Comma-separated payload widths, in bytes, to benchmark rows of "
+           "(default %s, empty to skip)." % _WIDTHS),
+    make_option('--database-file', action='store', dest='database_file',
+      default=None, help="File to create the SQLite test database in, "
+                         "rather than in memory."),
+    make_option('--use-existing', action='store_true', dest='use_existing',
+      default=False, help="Benchmark in the configured database, rather "
+                          "than a newly created test database."),
+    make_option('--output', action='store', dest='output', default=None,
+      help="File to write the results to, rather than standard output."),
+    make_option('--baseline', action='store', dest='baseline',
+      default=None, help="Results of an earlier run to compare with."),
+    make_option('--tolerance', action='store', type='float',
+      dest='tolerance', default=0.25, help="Fraction by which an operation "
+                                           "may slow down (default 0.25)."),
+  )
+
+  def _models(self, args):
+    "Returns the models named by `args`, or every installed one."
+    if not args:
+      return [model for model in models.get_models()
+              if issubclass(model, PositionalOrderMixin)]
+    result = []
+    for label in args:
+      if '.' in label:
+        model = models.get_model(*label.split('.', 1))
+        if model is None:
+          raise CommandError("Unknown model: %s" % label)
+        result.append(model)
+      else:
+        try:
+          app = models.get_app(label)
+        except Exception, e:
+          raise CommandError(e)
+        result.extend(model for model in models.get_models(app)
+                      if issubclass(model, PositionalOrderMixin))
+    for model in result:
+      if not issubclass(model, PositionalOrderMixin):
+        raise CommandError("%s.%s does not use PositionalOrderMixin" %
+          (model._meta.app_label, model._meta.object_name))
+    return result
+
+  def _benchmark(self, model, sizes, repeat, verbosity):
+    """Benchmarks `model` at each of `sizes`, returning the results, or None
+    if a list of `model` cannot be set up. The list is removed again
+    afterwards."""
+    label = '%s.%s' % (model._meta.app_label, model._meta.object_name)
+    kwargs = _create_list(model, sizes[0])
+    if kwargs is None:
+      return None
+    reports = []
+    def receiver(sender, **kwargs):
+      reports.append(kwargs)
+    positional_operation.connect(receiver, sender=model, weak=False)
+    try:
+      results, size = [], sizes[0]
+      for target in sizes:
+        _grow(model, kwargs, target - size)
+        size = target
+        for name, prepare, perform, restore in _operations(model, kwargs,
+                                                           size):
+          samples, queries, rows = [], None, None
+          for i in xrange(0, repeat):
+            arg = prepare()
+            del reports[:]
+            start = time.time()
+            perform(arg)
+            samples.append(time.time() - start)
+            if reports:
+              queries = max(queries, sum(x['queries'] for x in reports))
+              rows = max(rows, sum(x['rows'] for x in reports))
+            if restore is not None:
+              restore(arg)
+          samples.sort()
+          results.append({
+            'model': label, 'size': size, 'operation': name,
+            'seconds': samples[len(samples) // 2], 'best': samples[0],
+            'queries': queries, 'rows': rows,
+          })
+          if verbosity > 1:
+            self.stderr.write("%s.%s at %d: %.6fs\n" %
+                              (label, name, size, results[-1]['seconds']))
+    finally:
+      positional_operation.disconnect(receiver, sender=model)
+    model._positional_order_manager.filter(**kwargs).delete()
+    for related in kwargs.values():
+      related.delete()
+    return results
+
+  def _benchmark_classes(self, number, repeat, verbosity):
+    "Times the construction of `number` model classes."
+    samples = []
+    for i in xrange(0, repeat):
+      start = time.time()
+      _build_classes(number)
+      samples.append(time.time() - start)
+      # Forget the classes again, so that each run registers its classes with
+      # an empty application and the models built by the earlier runs are not
+      # kept alive:
+      app_cache.app_models.pop(_CLASS_APP_LABEL, None)
+      app_cache._get_models_cache.clear()
+    samples.sort()
+    result = {
+      'model': 'PositionalOrderMixin', 'size': number,
+      'operation': 'class_construction', 'seconds': samples[len(samples) // 2],
+      'best': samples[0], 'queries': None, 'rows': None,
+    }
+    if verbosity > 1:
+      self.stderr.write("PositionalOrderMixin.class_construction at %d: "
+                        "%.6fs\n" % (number, result['seconds']))
+    return result
+
+  def _benchmark_widths(self, connection, widths, sizes, repeat, verbosity):
+    """Benchmarks rows of each of `widths`, at those of `sizes` up to
+    _WIDTH_SIZE_LIMIT, in tables created for the purpose and dropped again
+    afterwards."""
+    sizes = [size for size in sizes if size <= _WIDTH_SIZE_LIMIT] or sizes[:1]
+    results = []
+    for width in widths:
+      related, model = _build_width_models(width)
+      _create_tables(connection, related, model)
+      try:
+        benchmark = self._benchmark(model, sizes, repeat, verbosity)
+      finally:
+        _drop_tables(connection, related, model)
+        app_cache.app_models.pop(_CLASS_APP_LABEL, None)
+        app_cache._get_models_cache.clear()
+      for result in benchmark:
+        result['width'] = width
+      results.extend(benchmark)
+    return results
+
+  def handle(self, *args, **options):
+    verbosity = int(options.get('verbosity', 1))
+    repeat = int(options.get('repeat', 5))
+    if repeat < 1:
+      raise CommandError("--repeat must be a positive integer.")
+    try:
+      sizes = [int(x) for x in options.get('sizes', _SIZES).split(',')]
+    except ValueError:
+      raise CommandError("--sizes must be a comma-separated list of "
+                         "integers.")
+    if not sizes or sizes[0] < 1 or sorted(set(sizes)) != sizes:
+      raise CommandError("--sizes must be positive and increasing.")
+    try:
+      widths = [int(x) for x in
+                (options.get('widths', _WIDTHS) or '').split(',') if x]
+    except ValueError:
+      raise CommandError("--widths must be a comma-separated list of "
+                         "integers.")
+    if any(width < 0 for width in widths):
+      raise CommandError("--widths must not be negative.")
+    classes = int(options.get('classes', 100))
+    if classes < 0:
+      raise CommandError("--classes must not be negative.")
+    tolerance = float(options.get('tolerance', 0.25))
+    if tolerance < 0:
+      raise CommandError("--tolerance must not be negative.")
+    baseline = None
+    if options.get('baseline'):
+      with open(options['baseline']) as stream:
+        baseline = json.load(stream)
+    benchmarked = self._models(args)
+
+    connection = connections[DEFAULT_DB_ALIAS]
+    if not options.get('use_existing', False):
+      if options.get('database_file'):
+        connection.settings_dict['TEST_NAME'] = options['database_file']
+      old_name = connection.settings_dict['NAME']
+      connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+      results = {
+        'database': {
+          'vendor': connection.vendor,
+          'name': connection.settings_dict['NAME'],
+        },
+        'repeat': repeat,
+        'results': [],
+      }
+      if classes:
+        results['results'].append(
+          self._benchmark_classes(classes, repeat, verbosity))
+      for model in benchmarked:
+        benchmark = None
+        if _supported(model):
+          benchmark = self._benchmark(model, sizes, repeat, verbosity)
+        if benchmark is None:
+          if verbosity > 1:
+            self.stderr.write("Skipping %s.%s, as its lists cannot be set "
+              "up by the benchmark\n" % (model._meta.app_label,
+                                         model._meta.object_name))
+          continue
+        results['results'].extend(benchmark)
+      if widths:
+        results['results'].extend(
+          self._benchmark_widths(connection, widths, sizes, repeat, verbosity))
+    finally:
+      if not options.get('use_existing', False):
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if options.get('output'):
+      with open(options['output'], 'w') as stream:
+        stream.write(output + '\n')
+    else:
+      self.stdout.write(output + '\n')
+
+    if baseline is not None:
+      regressions = compare(baseline, results, tolerance)
+      for regression in regressions:
+        self.stderr.write(regression + '\n')
+      if regressions:
+        raise CommandError("%d regression%s against %s" % (len(regressions),
+          len(regressions) != 1 and "s" or "", options['baseline']))
+
+# ===----------------------------------------------------------------------===
+# End of File
+# ===----------------------------------------------------------------------===
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# === django_patterns.management.commands.normalize_positions -------------===
+# Copyright © 2011-2012, RokuSigma Inc. and contributors. See AUTHORS for more
+# details.
+#
+# Some rights reserved.
+#
+# Redistribution and use in source and binary forms of the software as well as
+# documentation, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+#  * Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#  * The names of the copyright holders or contributors may not be used to
+#    endorse or promote products derived from this software without specific
+#    prior written permission.
+#
+# THIS SOFTWARE AND DOCUMENTATION IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS “AS IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+# OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE AND
+# DOCUMENTATION, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ===----------------------------------------------------------------------===
+
+"""
+Moves the lists of models using PositionalOrderMixin which grow at the front
+(with the Meta option `position_growth = 'front'`) under dense numbering back
+to start at position 0, as prepending an element leaves the front of its list
+one position further below zero. The lists are moved in batches of
+--batch-size lists to a transaction. If no applications are specified then
+every installed application is processed.
+"""
+
+# Python standard library, command-line options
+from optparse import make_option
+
+# Django-core, management commands
+from django.core.management.base import BaseCommand, CommandError
+
+# Django-core, object-relational mapper
+from django.db import models
+
+# Django-patterns, positional order mixin
+from django_patterns.db.models.mixins import PositionalOrderMixin
+
+class Command(BaseCommand):
+  args = '[app_label another_app ...]'
+  help = __doc__.strip()
+  option_list = BaseCommand.option_list + (
+    make_option('--batch-size', action='store', type='int', dest='batch_size',
+      default=100, help="Number of lists to move in each transaction."),
+  )
+
+  def handle(self, *args, **options):
+    verbosity = int(options.get('verbosity', 1))
+    batch_size = int(options.get('batch_size', 100))
+    if batch_size < 1:
+      raise CommandError("--batch-size must be a positive integer.")
+    if args:
+      try:
+        apps = [models.get_app(label) for label in args]
+      except Exception, e:
+        raise CommandError(e)
+    else:
+      apps = models.get_apps()
+    for app in apps:
+      for model in models.get_models(app, include_auto_created=True):
+        if not issubclass(model, PositionalOrderMixin):
+          continue
+        count = model.normalize_positions(batch_size=batch_size)
+        if verbosity > 1 or (count and verbosity > 0):
+          self.stdout.write("Normalized %d list%s of %s.%s\n" %
+            (count, count != 1 and "s" or "", model._meta.app_label,
+             model._meta.object_name))
+
+# ===----------------------------------------------------------------------===
+# End of File
+# ===----------------------------------------------------------------------===
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# === django_patterns.management.commands.rebuild_position_counts ---------===
+# Copyright © 2011-2012, RokuSigma Inc. and contributors. See AUTHORS for more
+# details.
+#
+# Some rights reserved.
+#
+# Redistribution and use in source and binary forms of the software as well as
+# documentation, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+#  * Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#  * The names of the copyright holders or contributors may not be used to
+#    endorse or promote products derived from this software without specific
+#    prior written permission.
+#
+# THIS SOFTWARE AND DOCUMENTATION IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS “AS IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+# OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE AND
+# DOCUMENTATION, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ===----------------------------------------------------------------------===
+
+"""
+Recounts the position indexes and list lengths kept for models using
+PositionalOrderMixin, which is only necessary if elements have been added,
+removed or moved behind the mixin's back. If no applications are specified
+then every installed application is processed.
+"""
+
+# Django-core, management commands
+from django.core.management.base import BaseCommand, CommandError
+
+# Django-core, object-relational mapper
+from django.db import models
+
+# Django-patterns, positional order mixin
+from django_patterns.db.models.mixins import PositionalOrderMixin
+
+class Command(BaseCommand):
+  args = '[app_label another_app ...]'
+  help = __doc__.strip()
+
+  def handle(self, *args, **options):
+    verbosity = int(options.get('verbosity', 1))
+    if args:
+      try:
+        apps = [models.get_app(label) for label in args]
+      except Exception, e:
+        raise CommandError(e)
+    else:
+      apps = models.get_apps()
+    for app in apps:
+      for model in models.get_models(app, include_auto_created=True):
+        if not issubclass(model, PositionalOrderMixin):
+          continue
+        if model._positional_index is not None:
+          model.rebuild_position_index()
+          if verbosity > 1:
+            self.stdout.write("Rebuilt position index of %s.%s\n" %
+              (model._meta.app_label, model._meta.object_name))
+        if model._positional_length is not None:
+          model.rebuild_position_length()
+          if verbosity > 1:
+            self.stdout.write("Rebuilt list lengths of %s.%s\n" %
+              (model._meta.app_label, model._meta.object_name))
+
+# ===----------------------------------------------------------------------===
+# End of File
+# ===----------------------------------------------------------------------===
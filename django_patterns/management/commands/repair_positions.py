@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# === django_patterns.management.commands.repair_positions ----------------===
+# Copyright © 2011-2012, RokuSigma Inc. and contributors. See AUTHORS for more
+# details.
+#
+# Some rights reserved.
+#
+# Redistribution and use in source and binary forms of the software as well as
+# documentation, with or without modification, are permitted provided that the
+# following conditions are met:
+#
+#  * Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#  * The names of the copyright holders or contributors may not be used to
+#    endorse or promote products derived from this software without specific
+#    prior written permission.
+#
+# THIS SOFTWARE AND DOCUMENTATION IS PROVIDED BY THE COPYRIGHT HOLDERS AND
+# CONTRIBUTORS “AS IS” AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT
+# NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A
+# PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS;
+# OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR
+# OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE AND
+# DOCUMENTATION, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ===----------------------------------------------------------------------===
+
+"""
+Checks the lists of every model using PositionalOrderMixin for duplicated
+positions, and under dense numbering for gaps and negative positions as well,
+and renumbers each list found to be broken. If no applications are specified
+then every installed application is checked. With --dry-run the broken lists
+are only reported.
+"""
+
+# Python standard library, command-line options
+from optparse import make_option
+
+# Python standard library, threads
+import threading
+
+# Django-core, management commands
+from django.core.management.base import BaseCommand, CommandError
+
+# Django-core, object-relational mapper
+from django.db import connections, models, router
+from django.db.models.fields.related import ManyToManyField
+from django.db.models.fields import FieldDoesNotExist
+
+# Django-patterns, positional order mixin
+from django_patterns.db.models.mixins import PositionalOrderMixin
+
+def _supported(model):
+  """Returns whether the lists of `model` can be checked, which is the case
+  unless they are linked lists, or ordered with respect to a many-to-many
+  relation."""
+  if model._positional_keys == 'linked':
+    return False
+  for name in model._positional_order_with_respect_to:
+    try:
+      field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+      return False
+    if isinstance(field, ManyToManyField):
+      return False
+  return True
+
+def _in_memory(model):
+  """Returns whether `model` is stored in an in-memory SQLite database, of
+  which each thread would open an empty copy of its own."""
+  connection = connections[router.db_for_read(model)]
+  return connection.vendor == 'sqlite' and \
+         connection.settings_dict['NAME'] == ':memory:'
+
+def _describe(problems):
+  "Returns a description of the problems found with a list."
+  return ", ".join("%d %s" % (count, name)
+                   for name, count in sorted(problems.iteritems()) if count)
+
+class Command(BaseCommand):
+  args = '[app_label another_app ...]'
+  help = __doc__.strip()
+  option_list = BaseCommand.option_list + (
+    make_option('--dry-run', action='store_true', dest='dry_run',
+      default=False, help="Report broken lists without repairing them."),
+    make_option('--workers', action='store', type='int', dest='workers',
+      default=1, help="Number of models to check at the same time, each "
+                      "with a database connection of its own."),
+  )
+
+  def _check(self, model, dry_run, report):
+    """Checks (and unless `dry_run` repairs) the lists of `model`, appending
+    the lines of the report to `report`."""
+    name = '%s.%s' % (model._meta.app_label, model._meta.object_name)
+    broken = 0
+    for kwargs, problems in model.check_positions():
+      broken += 1
+      if not dry_run:
+        model.repair_positions(**kwargs)
+      report.append("%s %r: %s%s" % (name, kwargs, _describe(problems),
+                                     not dry_run and " (repaired)" or ""))
+    report.append("%s: %d broken list%s" % (name, broken,
+                                            broken != 1 and "s" or ""))
+
+  def _work(self, queue, dry_run, errors):
+    "Checks models from `queue` until it is empty."
+    try:
+      while True:
+        try:
+          model, report = queue.pop(0)
+        except IndexError:
+          return
+        try:
+          self._check(model, dry_run, report)
+        except Exception, e:
+          errors.append(e)
+    finally:
+      for connection in connections.all():
+        connection.close()
+
+  def handle(self, *args, **options):
+    dry_run = options.get('dry_run', False)
+    workers = int(options.get('workers', 1))
+    if workers < 1:
+      raise CommandError("--workers must be a positive integer.")
+    if args:
+      try:
+        apps = [models.get_app(label) for label in args]
+      except Exception, e:
+        raise CommandError(e)
+    else:
+      apps = models.get_apps()
+
+    # Each model gets a report of its own, so that the reports of models
+    # checked at the same time are not interleaved:
+    queue, reports = [], []
+    for app in apps:
+      for model in models.get_models(app, include_auto_created=True):
+        if not issubclass(model, PositionalOrderMixin):
+          continue
+        if not _supported(model):
+          reports.append(["%s.%s: skipped, as its lists are linked or ordered "
+                          "with respect to a many-to-many relation" %
+                          (model._meta.app_label, model._meta.object_name)])
+          continue
+        report = []
+        queue.append((model, report))
+        reports.append(report)
+
+    if workers > 1 and any(_in_memory(model) for model, report in queue):
+      raise CommandError("--workers cannot be used with an in-memory SQLite "
+                         "database, which each worker would see empty.")
+
+    errors = []
+    if workers == 1:
+      for model, report in queue:
+        self._check(model, dry_run, report)
+    else:
+      threads = [threading.Thread(target=self._work,
+                                  args=(queue, dry_run, errors))
+                 for i in xrange(min(workers, len(queue)))]
+      for thread in threads:
+        thread.start()
+      for thread in threads:
+        thread.join()
+
+    for report in reports:
+      for line in report:
+        self.stdout.write(line + "\n")
+    if errors:
+      raise CommandError(errors[0])
+
+# ===----------------------------------------------------------------------===
+# End of File
+# ===----------------------------------------------------------------------===